@@ -0,0 +1,183 @@
+import sys
+
+import numpy as np
+
+from batch import NameResolver
+from snapshot import load_graph
+
+# Number of sources searched together, one per bit of a frontier word
+WORD_BITS = 64
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python analytics.py directory [person ...]")
+    directory = sys.argv[1]
+    graph = load_graph(directory)
+    engine = ReachEngine(graph)
+
+    # Report on the people named, or on everyone if nobody is
+    if len(sys.argv) > 2:
+        resolver = NameResolver(graph)
+        sources = []
+        for value in sys.argv[2:]:
+            index, error = resolver.resolve(value)
+            if error is not None:
+                sys.exit(error)
+            sources.append(index)
+    else:
+        sources = range(graph.num_people)
+
+    report = engine.report(sources)
+    print(f"Sources: {report['sources']}")
+    print(f"Mean reachable: {report['mean_reachable']:.1f}")
+    print("Eccentricity:")
+    for eccentricity, count in enumerate(report["eccentricities"]):
+        if count:
+            print(f"  {eccentricity}: {count}")
+    print("Degrees of separation:")
+    for degrees, count in enumerate(report["distances"]):
+        print(f"  {degrees}: {count}")
+
+
+class ReachEngine():
+    """
+    Counts how many people lie at each degree of separation from a set of
+    sources, expanding the frontiers of 64 sources at once.
+
+    Each person's frontier and visited state is a 64-bit word with one bit
+    per source, so a whole level for all 64 searches is two vectorized
+    OR-reductions over the CSR arrays: people to movies, then movies back
+    to people.
+    """
+
+    def __init__(self, graph):
+        self.num_people = graph.num_people
+        self.num_movies = graph.num_movies
+        self.person_movies = as_numpy(graph.person_movies)
+        self.movie_stars = as_numpy(graph.movie_stars)
+        self.person_segments = segments(as_numpy(graph.person_offsets))
+        self.movie_segments = segments(as_numpy(graph.movie_offsets))
+
+    def level_counts(self, sources, max_depth=None):
+        """
+        Returns, for each source person index, a list whose entry `d` is
+        the number of people exactly `d` degrees away.
+        """
+        sources = list(sources)
+        counts = []
+        for start in range(0, len(sources), WORD_BITS):
+            counts.extend(
+                self.level_counts_word(sources[start:start + WORD_BITS], max_depth)
+            )
+        return counts
+
+    def level_counts_word(self, sources, max_depth):
+        bits = np.uint64(1) << np.arange(len(sources), dtype=np.uint64)
+        frontier = np.zeros(self.num_people, dtype=np.uint64)
+        np.bitwise_or.at(frontier, np.asarray(sources, dtype=np.intp), bits)
+        visited = frontier.copy()
+        movies_seen = np.zeros(self.num_movies, dtype=np.uint64)
+
+        counts = [[1] for _ in sources]
+        depth = 0
+        while max_depth is None or depth < max_depth:
+            movies = reduce_segments(
+                frontier[self.movie_stars], self.movie_segments, self.num_movies
+            )
+            movies &= ~movies_seen
+            movies_seen |= movies
+            frontier = reduce_segments(
+                movies[self.person_movies], self.person_segments, self.num_people
+            )
+            frontier &= ~visited
+            if not frontier.any():
+                break
+            visited |= frontier
+            depth += 1
+            for k, count in enumerate(bit_counts(frontier)[:len(sources)]):
+                counts[k].append(int(count))
+
+        # Searches that finished early report trailing zero levels
+        for levels in counts:
+            while len(levels) > 1 and levels[-1] == 0:
+                levels.pop()
+        return counts
+
+    def within(self, source, k):
+        """
+        Returns the number of people within `k` degrees of person
+        index `source`, including the source themselves.
+        """
+        return sum(self.level_counts([source], max_depth=k)[0])
+
+    def report(self, sources):
+        """
+        Returns a summary over `sources` of their eccentricities (the
+        furthest degree reached) and a histogram of degrees of separation
+        to everyone they can reach.
+        """
+        eccentricities = []
+        distances = []
+        reachable = 0
+        counts = self.level_counts(sources)
+        for levels in counts:
+            eccentricity = len(levels) - 1
+            extend_to(eccentricities, eccentricity + 1)
+            eccentricities[eccentricity] += 1
+            extend_to(distances, len(levels))
+            for d, count in enumerate(levels):
+                distances[d] += count
+            reachable += sum(levels)
+        return {
+            "sources": len(counts),
+            "mean_reachable": reachable / len(counts) if counts else 0,
+            "eccentricities": eccentricities,
+            "distances": distances
+        }
+
+
+def as_numpy(values):
+    """
+    View a graph array (array.array or mapped memoryview) as NumPy,
+    without copying.
+    """
+    return np.frombuffer(values, dtype=np.dtype(memoryview(values).format))
+
+
+def segments(offsets):
+    """
+    Returns the (non-empty row mask, row starts) of CSR `offsets`, as
+    needed by `reduce_segments`.
+    """
+    offsets = offsets.astype(np.intp)
+    nonempty = offsets[:-1] < offsets[1:]
+    return nonempty, offsets[:-1][nonempty]
+
+
+def reduce_segments(values, segments, num_rows):
+    """
+    OR together `values` within each CSR row; empty rows give 0.
+    """
+    nonempty, starts = segments
+    result = np.zeros(num_rows, dtype=np.uint64)
+    if len(starts):
+        result[nonempty] = np.bitwise_or.reduceat(values, starts)
+    return result
+
+
+def bit_counts(words):
+    """
+    Returns how many of the uint64 `words` have each of the 64 bits set,
+    counted in a single pass over their bytes.
+    """
+    bytes_ = words.astype("<u8", copy=False).view(np.uint8)
+    return np.unpackbits(bytes_, bitorder="little").reshape(-1, WORD_BITS).sum(axis=0)
+
+
+def extend_to(values, length):
+    values.extend([0] * (length - len(values)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import csv
+import json
+import sys
+
+from lookup import NameIndex
+from snapshot import load_graph
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python batch.py directory [pairs.csv]")
+    directory = sys.argv[1]
+
+    graph = load_graph(directory)
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], encoding="utf-8") as f:
+            pairs = list(read_pairs(f))
+    else:
+        pairs = list(read_pairs(sys.stdin))
+
+    for result in answer_pairs(graph, pairs):
+        print(json.dumps(result))
+
+
+def read_pairs(f):
+    """
+    Yield (source, target) pairs from CSV lines of a file object. Each
+    side may be an IMDB person id or a person's name. Blank lines and
+    lines starting with "#" are skipped.
+    """
+    for row in csv.reader(f):
+        if not row or row[0].startswith("#"):
+            continue
+        if len(row) != 2:
+            raise ValueError(f"expected two columns, got {row}")
+        yield row[0].strip(), row[1].strip()
+
+
+class NameResolver():
+    """
+    Resolves person ids or names to person indices in a graph, without
+    prompting. Names that match several people are rejected, listing the
+    candidates, and unknown names suggest their closest matches.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.index = None
+
+    def resolve(self, value):
+        """
+        Returns (index, error) for an IMDB person id or a name.
+        """
+        index = self.graph.person_index(value)
+        if index is not None:
+            return index, None
+
+        # Build the name index on first use, as id-only batches never need it
+        if self.index is None:
+            self.index = NameIndex(self.graph)
+        matches = self.index.exact(value)
+        if len(matches) == 1:
+            return matches[0], None
+        if matches:
+            candidates = ", ".join(
+                f"{self.graph.person_ids[i]} (born {self.graph.person_births[i]})"
+                for i in matches
+            )
+            return None, f"ambiguous name: {value} (ids {candidates})"
+        suggestions = ", ".join(
+            candidate.name for candidate in self.index.lookup(value, limit=3)
+        )
+        if suggestions:
+            return None, f"person not found: {value} (did you mean {suggestions}?)"
+        return None, f"person not found: {value}"
+
+
+def answer_pairs(graph, pairs, resolver=None):
+    """
+    Returns a list of one result dict per (source, target) pair, in
+    input order.
+
+    Pairs are grouped by source so each source's breadth-first search
+    runs once and is shared by all of its targets; results are therefore
+    only complete once every group is searched.
+    """
+    resolver = resolver or NameResolver(graph)
+    results = [None] * len(pairs)
+    groups = {}
+    for n, (source, target) in enumerate(pairs):
+        i, error = resolver.resolve(source)
+        k, target_error = resolver.resolve(target)
+        error = error or target_error
+        if error is not None:
+            results[n] = {"source": source, "target": target, "error": error}
+        else:
+            groups.setdefault(i, []).append((n, k))
+
+    for i, queries in groups.items():
+        parent_person, parent_movie = graph.bfs_tree(
+            i, [k for _, k in queries]
+        )
+        for n, k in queries:
+            path = graph.path_to(parent_person, parent_movie, k)
+            results[n] = {
+                "source": graph.person_ids[i],
+                "target": graph.person_ids[k],
+                "degrees": None if path is None else len(path),
+                "path": path
+            }
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import csv
 import sys
 
+from loader import LoadStats, stream_table
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -52,6 +53,67 @@ def load_data(directory):
                 pass
 
 
+def load_data_streaming(directory, trace_memory=False):
+    """
+    Load data from CSV files into memory like `load_data`, reading columns
+    positionally in chunks rather than building a dict per row.
+
+    Returns a LoadStats with per-file timings and skipped-row counts,
+    and peak memory use.
+    """
+    stats = LoadStats(trace_memory)
+    stats.start()
+
+    # Load people
+    def add_people(ids, person_names, births):
+        for person_id, name, birth in zip(ids, person_names, births):
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
+                "movies": set()
+            }
+            names.setdefault(name.lower(), set()).add(person_id)
+        return 0
+
+    stream_table(
+        f"{directory}/people.csv", ("id", "name", "birth"), stats, add_people
+    )
+
+    # Load movies
+    def add_movies(ids, titles, years):
+        for movie_id, title, year in zip(ids, titles, years):
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
+                "stars": set()
+            }
+        return 0
+
+    stream_table(
+        f"{directory}/movies.csv", ("id", "title", "year"), stats, add_movies
+    )
+
+    # Load stars, counting rather than raising on unknown ids
+    def add_stars(person_ids, movie_ids):
+        skipped = 0
+        for person_id, movie_id in zip(person_ids, movie_ids):
+            person = people.get(person_id)
+            movie = movies.get(movie_id)
+            if person is None or movie is None:
+                skipped += 1
+                continue
+            person["movies"].add(movie_id)
+            movie["stars"].add(person_id)
+        return skipped
+
+    stream_table(
+        f"{directory}/stars.csv", ("person_id", "movie_id"), stats, add_stars
+    )
+
+    stats.stop()
+    return stats
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -59,8 +121,9 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    stats = load_data_streaming(directory)
     print("Data loaded.")
+    print(stats)
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +132,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path_bidirectional(source, target)
 
     if path is None:
         print("Not connected.")
@@ -140,6 +203,79 @@ def shortest_path(source, target):
                 child = Node(state=state, parent=node, action=action)
                 frontier.add(child)
 
+
+def shortest_path_bidirectional(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching outwards from
+    both ends at once and meeting in the middle.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie_id, person_id) edge it was
+    # reached through, or None for the person the search started from
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    # Always expand a whole level of the smaller frontier
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_level(
+                forward_frontier, forward, backward
+            )
+        else:
+            backward_frontier, meeting = expand_level(
+                backward_frontier, backward, forward
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+    return None
+
+
+def expand_level(frontier, reached, other_reached):
+    """
+    Expands every person in `frontier` by one step, recording new people
+    in `reached`. Returns the next frontier and the first person also
+    reached from the other side, or None if the searches have not met.
+    """
+    next_frontier = []
+    for person_id in frontier:
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in reached:
+                continue
+            reached[neighbor_id] = (movie_id, person_id)
+            if neighbor_id in other_reached:
+                return next_frontier, neighbor_id
+            next_frontier.append(neighbor_id)
+    return next_frontier, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the forward and backward search trees at `meeting` into a
+    list of (movie_id, person_id) pairs from source to target.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, next_id = backward[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
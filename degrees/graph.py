@@ -0,0 +1,385 @@
+from array import array
+
+from loader import stream_table
+
+# Typecode used for all offset and index arrays (4-byte signed integers)
+INDEX_TYPECODE = "i"
+
+
+class StarGraph():
+    """
+    Compact in-memory form of the degrees dataset.
+
+    People and movies are interned to dense integers in file order, and the
+    bipartite graph of who starred in what is stored twice as CSR arrays:
+    the movies of person `i` are `person_movies[person_offsets[i]:
+    person_offsets[i + 1]]`, and the stars of movie `j` are
+    `movie_stars[movie_offsets[j]:movie_offsets[j + 1]]`.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self._person_index = None
+        self._movie_index = None
+
+        # Optional precomputed co-star index used for expansion when set
+        self.neighbor_index = None
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Build a graph from the `people` and `movies` dicts filled in by
+        `degrees.load_data`.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        star_people = array(INDEX_TYPECODE)
+        star_movies = array(INDEX_TYPECODE)
+        for person_id in person_ids:
+            i = person_index[person_id]
+            for movie_id in people[person_id]["movies"]:
+                star_people.append(i)
+                star_movies.append(movie_index[movie_id])
+
+        return cls.from_stars(
+            person_ids,
+            [people[person_id]["name"] for person_id in person_ids],
+            [people[person_id]["birth"] for person_id in person_ids],
+            movie_ids,
+            [movies[movie_id]["title"] for movie_id in movie_ids],
+            [movies[movie_id]["year"] for movie_id in movie_ids],
+            star_people, star_movies
+        )
+
+    @classmethod
+    def from_csv(cls, directory, stats=None):
+        """
+        Build a graph straight from the CSV files in `directory`, without
+        going through the dict-of-sets representation. Load timings and
+        skipped rows are recorded in `stats` if given.
+        """
+        person_ids, person_names, person_births = stream_table(
+            f"{directory}/people.csv", ("id", "name", "birth"), stats
+        )
+        movie_ids, movie_titles, movie_years = stream_table(
+            f"{directory}/movies.csv", ("id", "title", "year"), stats
+        )
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        star_people = array(INDEX_TYPECODE)
+        star_movies = array(INDEX_TYPECODE)
+
+        def add_stars(person_column, movie_column):
+            skipped = 0
+            for i, j in zip(map(person_index.get, person_column),
+                            map(movie_index.get, movie_column)):
+                if i is None or j is None:
+                    skipped += 1
+                    continue
+                star_people.append(i)
+                star_movies.append(j)
+            return skipped
+
+        stream_table(
+            f"{directory}/stars.csv", ("person_id", "movie_id"), stats, add_stars
+        )
+
+        return cls.from_stars(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            star_people, star_movies
+        )
+
+    @classmethod
+    def from_stars(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   star_people, star_movies):
+        """
+        Build a graph from parallel arrays of (person, movie) index pairs.
+        """
+        person_offsets, person_movies = build_csr(
+            star_people, star_movies, len(person_ids)
+        )
+        movie_offsets, movie_stars = build_csr(
+            star_movies, star_people, len(movie_ids)
+        )
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies, movie_offsets, movie_stars
+        )
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index for an IMDB person id, or None.
+        """
+        # Snapshot string tables can search themselves without decoding
+        # every id into a dict first
+        if hasattr(self.person_ids, "find"):
+            return self.person_ids.find(person_id)
+        if self._person_index is None:
+            self._person_index = {
+                person_id: i for i, person_id in enumerate(self.person_ids)
+            }
+        return self._person_index.get(person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index for an IMDB movie id, or None.
+        """
+        if hasattr(self.movie_ids, "find"):
+            return self.movie_ids.find(movie_id)
+        if self._movie_index is None:
+            self._movie_index = {
+                movie_id: i for i, movie_id in enumerate(self.movie_ids)
+            }
+        return self._movie_index.get(movie_id)
+
+    def movies_for_person(self, i):
+        return self.person_movies[self.person_offsets[i]:self.person_offsets[i + 1]]
+
+    def stars_for_movie(self, j):
+        return self.movie_stars[self.movie_offsets[j]:self.movie_offsets[j + 1]]
+
+    def co_stars(self, i):
+        """
+        Returns parallel (movies, people) sequences for the people who
+        starred with person `i`, each listed once with one movie they
+        share. With a neighbor index attached these are views into its
+        arrays, so nothing is built per call.
+        """
+        if self.neighbor_index is not None:
+            return self.neighbor_index.neighbors_for_person(i)
+        co_stars = {}
+        for j in self.movies_for_person(i):
+            for k in self.stars_for_movie(j):
+                if k != i and k not in co_stars:
+                    co_stars[k] = j
+        return list(co_stars.values()), list(co_stars.keys())
+
+    def neighbors_for_person(self, i):
+        """
+        Returns (movie, person) index pairs for people who starred
+        with person `i`, not including `i` themselves.
+
+        Kept for callers that want a set of pairs; `co_stars` expands a
+        person without building one.
+        """
+        if self.neighbor_index is not None:
+            return set(zip(*self.co_stars(i)))
+
+        neighbors = set()
+        for j in self.movies_for_person(i):
+            for k in self.stars_for_movie(j):
+                if k != i:
+                    neighbors.add((j, k))
+        return neighbors
+
+    def bfs_tree(self, source, targets=None):
+        """
+        Runs a breadth-first search from person index `source`, stopping
+        early once every person index in `targets` is reached if given.
+
+        Returns two arrays mapping each reached person to the person and
+        movie they were reached through. Unreached people have a parent
+        of -1; the source is its own parent.
+        """
+        if self.neighbor_index is not None:
+            return self.neighbor_index.bfs_tree(source, targets)
+
+        parent_person = array(INDEX_TYPECODE, [-1]) * self.num_people
+        parent_movie = array(INDEX_TYPECODE, [-1]) * self.num_people
+        movie_seen = bytearray(self.num_movies)
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        parent_person[source] = source
+        remaining = None
+        if targets is not None:
+            remaining = set(targets)
+            remaining.discard(source)
+            if not remaining:
+                return parent_person, parent_movie
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                for e in range(person_offsets[i], person_offsets[i + 1]):
+                    j = person_movies[e]
+
+                    # Every star of a movie is reached the first time the
+                    # movie is, so no movie needs expanding twice
+                    if movie_seen[j]:
+                        continue
+                    movie_seen[j] = 1
+                    for f in range(movie_offsets[j], movie_offsets[j + 1]):
+                        k = movie_stars[f]
+                        if parent_person[k] != -1:
+                            continue
+                        parent_person[k] = i
+                        parent_movie[k] = j
+                        if remaining is not None and k in remaining:
+                            remaining.discard(k)
+                            if not remaining:
+                                return parent_person, parent_movie
+                        next_frontier.append(k)
+            frontier = next_frontier
+        return parent_person, parent_movie
+
+    def path_to(self, parent_person, parent_movie, target):
+        """
+        Returns the list of (movie_id, person_id) pairs leading to person
+        index `target` in a tree from `bfs_tree`, or None if unreached.
+        """
+        if parent_person[target] == -1:
+            return None
+        path = []
+        k = target
+        while parent_person[k] != k:
+            path.append((self.movie_ids[parent_movie[k]], self.person_ids[k]))
+            k = parent_person[k]
+        path.reverse()
+        return path
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect IMDB person id `source` to `target`.
+
+        If no possible path, returns None.
+        """
+        i = self.person_index(source)
+        k = self.person_index(target)
+        if i is None or k is None:
+            return None
+        parent_person, parent_movie = self.bfs_tree(i, (k,))
+        return self.path_to(parent_person, parent_movie, k)
+
+
+class NeighborIndex():
+    """
+    Precomputed co-star adjacency in CSR form.
+
+    The co-stars of person `i` are `neighbors[offsets[i]:offsets[i + 1]]`,
+    each listed once, with the matching entry of `via_movies` giving one
+    movie they starred in together. Expanding a person is then a pair of
+    array slices instead of a nested loop over movies and casts.
+    """
+
+    def __init__(self, offsets, neighbors, via_movies):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.via_movies = via_movies
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build the index for every person in a StarGraph.
+        """
+        offsets = array(INDEX_TYPECODE, [0])
+        neighbors = array(INDEX_TYPECODE)
+        via_movies = array(INDEX_TYPECODE)
+        for i in range(graph.num_people):
+            co_stars = {}
+            for j in graph.movies_for_person(i):
+                for k in graph.stars_for_movie(j):
+                    if k != i and k not in co_stars:
+                        co_stars[k] = j
+            neighbors.extend(co_stars.keys())
+            via_movies.extend(co_stars.values())
+            offsets.append(len(neighbors))
+        return cls(offsets, neighbors, via_movies)
+
+    @property
+    def num_people(self):
+        return len(self.offsets) - 1
+
+    def neighbors_for_person(self, i):
+        """
+        Returns parallel (movies, people) views of the index's arrays for
+        the co-stars of `i`, without copying them.
+        """
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return (
+            memoryview(self.via_movies)[start:end],
+            memoryview(self.neighbors)[start:end]
+        )
+
+    def bfs_tree(self, source, targets=None):
+        """
+        Same as `StarGraph.bfs_tree`, expanding through the index.
+        """
+        parent_person = array(INDEX_TYPECODE, [-1]) * self.num_people
+        parent_movie = array(INDEX_TYPECODE, [-1]) * self.num_people
+        offsets = self.offsets
+        neighbors = self.neighbors
+        via_movies = self.via_movies
+
+        parent_person[source] = source
+        remaining = None
+        if targets is not None:
+            remaining = set(targets)
+            remaining.discard(source)
+            if not remaining:
+                return parent_person, parent_movie
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                for e in range(offsets[i], offsets[i + 1]):
+                    k = neighbors[e]
+                    if parent_person[k] != -1:
+                        continue
+                    parent_person[k] = i
+                    parent_movie[k] = via_movies[e]
+                    if remaining is not None and k in remaining:
+                        remaining.discard(k)
+                        if not remaining:
+                            return parent_person, parent_movie
+                    next_frontier.append(k)
+            frontier = next_frontier
+        return parent_person, parent_movie
+
+
+def build_csr(rows, cols, num_rows):
+    """
+    Counting-sort parallel arrays of (row, col) pairs into CSR form.
+    Returns (offsets, indices) arrays.
+    """
+    offsets = array(INDEX_TYPECODE, [0]) * (num_rows + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(num_rows):
+        offsets[i + 1] += offsets[i]
+
+    indices = array(INDEX_TYPECODE, [0]) * len(cols)
+    cursor = offsets[:-1]
+    for row, col in zip(rows, cols):
+        indices[cursor[row]] = col
+        cursor[row] += 1
+    return offsets, indices
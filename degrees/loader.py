@@ -0,0 +1,120 @@
+import csv
+import time
+import tracemalloc
+from itertools import islice
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+# Rows read from a CSV file per chunk
+CHUNK_SIZE = 65536
+
+
+class LoadStats():
+    """
+    Timing, row counts and peak memory collected while loading data.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.files = {}
+        self.trace_memory = trace_memory
+        self.seconds = 0
+        self.peak_traced = None
+        self.peak_rss = None
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.started
+        if self.trace_memory:
+            self.peak_traced = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux
+            self.peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def record(self, filename, rows, skipped, seconds):
+        self.files[filename] = {
+            "rows": rows,
+            "skipped": skipped,
+            "seconds": seconds
+        }
+
+    @property
+    def skipped(self):
+        return sum(file["skipped"] for file in self.files.values())
+
+    def __str__(self):
+        lines = [f"Loaded in {self.seconds:.2f}s"]
+        for filename, file in self.files.items():
+            lines.append(
+                f"  {filename}: {file['rows']} rows, {file['skipped']} skipped, "
+                f"{file['seconds']:.2f}s"
+            )
+        if self.peak_traced is not None:
+            lines.append(f"  Peak traced memory: {self.peak_traced / 2 ** 20:.1f} MiB")
+        if self.peak_rss is not None:
+            lines.append(f"  Peak RSS: {self.peak_rss / 2 ** 20:.1f} MiB")
+        return "\n".join(lines)
+
+
+class Chunk(list):
+    """
+    Column lists for one chunk of a CSV file, plus the number of rows
+    read for it (including any dropped as malformed).
+    """
+
+    def __init__(self, columns, rows_read):
+        super().__init__(columns)
+        self.rows_read = rows_read
+
+
+def read_chunks(filename, columns, chunk_size=CHUNK_SIZE):
+    """
+    Yield the named `columns` of a CSV file in chunks, each a list of
+    per-column value lists. Rows too short to hold every column are
+    dropped; the caller can count them from `rows_read`.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(column) for column in columns]
+        width = max(positions) + 1
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                break
+            complete = [row for row in rows if len(row) >= width]
+            chunk = [[row[position] for row in complete] for position in positions]
+            yield Chunk(chunk, len(rows))
+
+
+def stream_table(filename, columns, stats=None, handle=None):
+    """
+    Read the named `columns` of a CSV file chunk by chunk, passing each
+    chunk's column lists to `handle`, which returns how many rows of it
+    it rejected. Without `handle`, returns the columns as full lists.
+    Row and skip counts are recorded in `stats` when given.
+    """
+    started = time.perf_counter()
+    rows = 0
+    skipped = 0
+    values = [[] for _ in columns]
+    for chunk in read_chunks(filename, columns):
+        rows += chunk.rows_read
+        skipped += chunk.rows_read - len(chunk[0])
+        if handle is None:
+            for value, column in zip(values, chunk):
+                value.extend(column)
+        else:
+            skipped += handle(*chunk)
+    if stats is not None:
+        stats.record(filename, rows, skipped, time.perf_counter() - started)
+    return values
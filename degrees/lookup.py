@@ -0,0 +1,182 @@
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+import numpy as np
+
+from graph import INDEX_TYPECODE
+from snapshot import load_graph
+
+# Query trigrams matching more names than this are too common to be worth
+# scanning for fuzzy candidates, unless nothing rarer is available
+MAX_POSTINGS = 20000
+
+# Most postings scanned by one fuzzy query, across all of its trigrams
+MAX_SCANNED = 50000
+
+# Fuzzy candidates rescored exactly per result wanted, taken from those
+# sharing the most scanned trigrams with the query
+RESCORED_PER_RESULT = 4
+
+# Fuzzy candidates sharing fewer trigrams than this fraction of the
+# query's are not scored
+MIN_SHARED = 0.5
+
+Candidate = namedtuple("Candidate", ["person_id", "name", "birth", "score"])
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python lookup.py directory query")
+    graph = load_graph(sys.argv[1])
+    index = NameIndex(graph)
+    for candidate in index.lookup(sys.argv[2]):
+        print(f"{candidate.score:.2f}  ID: {candidate.person_id}, "
+              f"Name: {candidate.name}, Birth: {candidate.birth}")
+
+
+class NameIndex():
+    """
+    Non-interactive name lookup for the people of a StarGraph.
+
+    Normalized names are kept sorted so exact and prefix matches are a
+    bisection, and a trigram inverted index finds approximate matches
+    without comparing the query against every name.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        keys = [normalize(name) for name in graph.person_names]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.people = array(INDEX_TYPECODE, order)
+
+        # Maps each trigram to the positions in `keys` of names containing it
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array(INDEX_TYPECODE)).append(position)
+        self.postings = postings
+        self.gram_counts = np.array([len(trigrams(key)) for key in self.keys])
+
+    def exact(self, name):
+        """
+        Returns the person indices whose name matches `name`, ignoring
+        case, accents and spacing.
+        """
+        key = normalize(name)
+        position = bisect_left(self.keys, key)
+        matches = []
+        while position < len(self.keys) and self.keys[position] == key:
+            matches.append(self.people[position])
+            position += 1
+        return matches
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` person indices whose name starts with `prefix`,
+        in name order.
+        """
+        key = normalize(prefix)
+        position = bisect_left(self.keys, key)
+        matches = []
+        while (len(matches) < limit and position < len(self.keys)
+               and self.keys[position].startswith(key)):
+            matches.append(self.people[position])
+            position += 1
+        return matches
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to `limit` (person index, similarity) pairs for names
+        sharing the most trigrams with `name`, best first. Similarity is
+        the Dice coefficient of the two names' trigram sets.
+        """
+        key = normalize(name)
+        grams = trigrams(key)
+        lists = sorted(
+            (self.postings[gram] for gram in grams if gram in self.postings),
+            key=len
+        )
+        if not lists:
+            return []
+
+        # Scan the rarest trigrams first, within a fixed number of postings
+        scanned = []
+        budget = MAX_SCANNED
+        for postings in lists:
+            if scanned and (len(postings) > MAX_POSTINGS or len(postings) > budget):
+                break
+            scanned.append(np.frombuffer(postings, dtype=np.intc)[:budget])
+            budget -= len(scanned[-1])
+        positions, shared = np.unique(np.concatenate(scanned), return_counts=True)
+        keep = shared >= MIN_SHARED * len(scanned)
+        positions, shared = positions[keep], shared[keep]
+
+        # Estimate similarity from the scanned trigrams alone, then score
+        # the most promising candidates exactly
+        estimate = 2 * shared / (len(grams) + self.gram_counts[positions])
+        wanted = limit * RESCORED_PER_RESULT
+        if len(positions) > wanted:
+            best = np.argpartition(-estimate, wanted)[:wanted]
+            positions = positions[best]
+
+        scored = []
+        for position in positions.tolist():
+            candidate_grams = trigrams(self.keys[position])
+            common = len(grams & candidate_grams)
+            score = 2 * common / (len(grams) + len(candidate_grams))
+            scored.append((score, position))
+        scored.sort(key=lambda item: (-item[0], self.keys[item[1]]))
+        return [(self.people[position], score) for score, position in scored[:limit]]
+
+    def lookup(self, query, limit=10):
+        """
+        Returns up to `limit` ranked Candidates for `query`: exact matches
+        first, then names starting with it, or approximate matches only if
+        there are neither.
+        """
+        ranked = {}
+        for i in self.exact(query):
+            ranked[i] = 1.0
+        key = normalize(query)
+        for i in self.prefix(query, limit):
+            ranked.setdefault(i, len(key) / len(normalize(self.graph.person_names[i])))
+        if not ranked:
+            for i, score in self.fuzzy(query, limit):
+                ranked.setdefault(i, min(score, 0.99))
+
+        best = sorted(ranked.items(), key=lambda item: -item[1])[:limit]
+        return [
+            Candidate(
+                self.graph.person_ids[i],
+                self.graph.person_names[i],
+                self.graph.person_births[i],
+                score
+            )
+            for i, score in best
+        ]
+
+
+def normalize(name):
+    """
+    Returns `name` casefolded, with accents removed and spacing collapsed.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+def trigrams(key):
+    """
+    Returns the set of trigrams of a normalized name, padded so the
+    start and end of the name count too.
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+if __name__ == "__main__":
+    main()
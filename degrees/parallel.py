@@ -0,0 +1,110 @@
+import json
+import multiprocessing
+import sys
+
+from batch import NameResolver, answer_pairs, read_pairs
+from snapshot import build_snapshot, default_path, is_fresh, load_snapshot
+
+# Graph mapped by each worker process, shared through the page cache,
+# and the worker's resolver, whose name index is built at most once
+graph = None
+resolver = None
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python parallel.py directory processes [pairs.csv]")
+    directory = sys.argv[1]
+    processes = int(sys.argv[2])
+
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], encoding="utf-8") as f:
+            pairs = list(read_pairs(f))
+    else:
+        pairs = list(read_pairs(sys.stdin))
+
+    with ParallelQueryExecutor(directory, processes) as executor:
+        for result in executor.answer_pairs(pairs):
+            print(json.dumps(result))
+
+
+class ParallelQueryExecutor():
+    """
+    Answers path queries on a pool of worker processes.
+
+    The graph is written once as a snapshot, and every worker maps that
+    same file read-only, so all processes share one copy of the graph in
+    the operating system's page cache rather than each loading their own.
+    The executor maps it too, to resolve names before handing out work.
+    """
+
+    def __init__(self, directory, processes=None, path=None):
+        path = path or default_path(directory)
+        if not is_fresh(directory, path):
+            build_snapshot(directory, path)
+        self.resolver = NameResolver(load_snapshot(path))
+        self.pool = multiprocessing.Pool(
+            processes, initializer=init_worker, initargs=(path,)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def answer_pairs(self, pairs, chunksize=1):
+        """
+        Returns one result dict per (source, target) pair, in input order,
+        in the same format as `batch.answer_pairs`.
+
+        Pairs are resolved and grouped by source person before being
+        handed out, so each person's search runs only once, however their
+        sources were written. Workers are sent person ids.
+        """
+        graph = self.resolver.graph
+        results = [None] * len(pairs)
+        groups = {}
+        for n, (source, target) in enumerate(pairs):
+            i, error = self.resolver.resolve(source)
+            k, target_error = self.resolver.resolve(target)
+            error = error or target_error
+            if error is not None:
+                results[n] = {"source": source, "target": target, "error": error}
+            else:
+                groups.setdefault(i, []).append(
+                    (n, graph.person_ids[i], graph.person_ids[k])
+                )
+
+        answered = self.pool.imap_unordered(
+            answer_group, groups.values(), chunksize
+        )
+        for group in answered:
+            for n, result in group:
+                results[n] = result
+        return results
+
+
+def init_worker(path):
+    global graph, resolver
+    graph = load_snapshot(path)
+    resolver = NameResolver(graph)
+
+
+def answer_group(group):
+    """
+    Answer a list of (n, source, target) queries sharing one source,
+    returning (n, result) pairs.
+    """
+    results = answer_pairs(
+        graph, [(source, target) for _, source, target in group], resolver
+    )
+    return [(n, result) for (n, _, _), result in zip(group, results)]
+
+
+if __name__ == "__main__":
+    main()
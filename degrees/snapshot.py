@@ -0,0 +1,296 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from graph import INDEX_TYPECODE, NeighborIndex, StarGraph
+
+MAGIC = b"DEGSNAP1"
+VERSION = 1
+
+# CSV files a snapshot is built from, checked for staleness on load
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Graph arrays stored as raw sections
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars")
+
+# String columns stored as (offsets, utf-8 blob) section pairs; id columns
+# also store an order array sorted by value so lookups can bisect
+STRINGS = ("person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years")
+SORTED_STRINGS = ("person_ids", "movie_ids")
+
+STRING_OFFSET_TYPECODE = "q"
+
+# Arrays of a NeighborIndex file
+NEIGHBOR_ARRAYS = ("offsets", "neighbors", "via_movies")
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python snapshot.py directory [snapshot]")
+    directory = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) == 3 else None
+    path = build_snapshot(directory, path)
+    print(f"Snapshot written to {path}.")
+
+
+class StringTable():
+    """
+    Read-only sequence of strings backed by a mapped offsets array and
+    utf-8 blob. Strings are only decoded when accessed.
+    """
+
+    def __init__(self, offsets, blob, order=None):
+        self.offsets = offsets
+        self.blob = blob
+        self.order = order
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def find(self, value):
+        """
+        Returns the index of `value`, or None. Requires a sorted order.
+        """
+        position = bisect_left(SortedView(self), value)
+        if position < len(self) and self[self.order[position]] == value:
+            return self.order[position]
+        return None
+
+
+class SortedView():
+    """
+    View of a StringTable in sorted order, for use with bisect.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, position):
+        return self.table[self.table.order[position]]
+
+
+def default_path(directory):
+    return os.path.join(directory, "degrees.snapshot")
+
+
+def source_stats(directory):
+    """
+    Returns the (mtime_ns, size) of each source CSV in `directory`.
+    """
+    stats = {}
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stats[filename] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def build_snapshot(directory, path=None):
+    """
+    Parse the CSV files in `directory` and write a binary snapshot of
+    the resulting graph to `path`. Returns the path written.
+    """
+    path = path or default_path(directory)
+    stats = source_stats(directory)
+    graph = StarGraph.from_csv(directory)
+    write_snapshot(graph, path, stats)
+    return path
+
+
+def write_snapshot(graph, path, sources=None):
+    """
+    Write `graph` to `path` as a snapshot, recording the `sources`
+    stats it was built from.
+    """
+    sections = []
+    for name in ARRAYS:
+        sections.append((name, as_array(getattr(graph, name), INDEX_TYPECODE)))
+    for name in STRINGS:
+        values = getattr(graph, name)
+        offsets = array(STRING_OFFSET_TYPECODE, [0])
+        blob = bytearray()
+        for value in values:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+        sections.append((f"{name}.offsets", offsets))
+        sections.append((f"{name}.blob", bytes(blob)))
+        if name in SORTED_STRINGS:
+            order = sorted(range(len(values)), key=values.__getitem__)
+            sections.append((f"{name}.order", array(INDEX_TYPECODE, order)))
+
+    write_sections(path, sections, sources)
+
+
+def write_sections(path, sections, sources=None):
+    """
+    Write named (name, array or bytes) `sections` to `path` behind a
+    header recording the `sources` stats they were built from.
+    """
+    # Lay sections out after the header, each aligned to 8 bytes
+    layout = {}
+    position = 0
+    for name, data in sections:
+        typecode = data.typecode if isinstance(data, array) else "B"
+        size = len(memoryview(data).cast("B"))
+        layout[name] = [position, size, typecode]
+        position += align(size)
+    header = json.dumps({
+        "version": VERSION,
+        "sources": sources or {},
+        "sections": layout
+    }).encode("utf-8")
+    data_start = align(len(MAGIC) + 8 + len(header))
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(bytes(data_start - f.tell()))
+        for name, data in sections:
+            raw = memoryview(data).cast("B")
+            f.write(raw)
+            f.write(bytes(align(len(raw)) - len(raw)))
+    os.replace(temporary, path)
+
+
+def read_header(f):
+    """
+    Read and return the JSON header of an open snapshot file, along with
+    the offset its data sections start at.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a degrees snapshot")
+    (length,) = struct.unpack("<Q", f.read(8))
+    header = json.loads(f.read(length))
+    if header["version"] != VERSION:
+        raise ValueError("unsupported snapshot version")
+    return header, align(len(MAGIC) + 8 + length)
+
+
+def is_fresh(directory, path=None):
+    """
+    Returns True if a snapshot exists at `path` and was built from the
+    current versions of the CSV files in `directory`.
+    """
+    path = path or default_path(directory)
+    try:
+        with open(path, "rb") as f:
+            header, _ = read_header(f)
+    except (OSError, ValueError):
+        return False
+    return header["sources"] == source_stats(directory)
+
+
+def load_snapshot(path):
+    """
+    Map a snapshot into memory and return it as a StarGraph. Nothing is
+    read from disk until the graph's arrays and strings are accessed.
+    """
+    section, mapping = map_sections(path)
+    fields = {name: section(name) for name in ARRAYS}
+    for name in STRINGS:
+        order = section(f"{name}.order") if name in SORTED_STRINGS else None
+        fields[name] = StringTable(
+            section(f"{name}.offsets"), section(f"{name}.blob"), order
+        )
+    graph = StarGraph(**fields)
+
+    # Keep the mapping alive for as long as the graph is
+    graph.mapping = mapping
+    return graph
+
+
+def map_sections(path):
+    """
+    Map the file at `path` read-only. Returns a function giving a view of
+    a named section, and the mapping that must be kept alive with it.
+    """
+    with open(path, "rb") as f:
+        header, data_start = read_header(f)
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+
+    def section(name):
+        offset, size, typecode = header["sections"][name]
+        start = data_start + offset
+        return view[start:start + size].cast(typecode)
+
+    return section, mapping
+
+
+def load_graph(directory, path=None, neighbors=False):
+    """
+    Returns the graph for `directory`, mapped from its snapshot, which is
+    rebuilt first if it is missing or older than the CSV files. With
+    `neighbors`, the co-star index is also loaded and used for searches.
+    """
+    path = path or default_path(directory)
+    if not is_fresh(directory, path):
+        build_snapshot(directory, path)
+    graph = load_snapshot(path)
+    if neighbors:
+        graph.neighbor_index = load_neighbor_index(directory, graph)
+    return graph
+
+
+def default_neighbors_path(directory):
+    return os.path.join(directory, "neighbors.snapshot")
+
+
+def write_neighbor_index(index, path, sources=None):
+    """
+    Write a NeighborIndex to `path`, recording the `sources` stats it
+    was built from.
+    """
+    write_sections(path, [
+        (name, as_array(getattr(index, name), INDEX_TYPECODE))
+        for name in NEIGHBOR_ARRAYS
+    ], sources)
+
+
+def load_neighbor_index(directory, graph, path=None):
+    """
+    Returns the co-star index for `graph`, mapped from its file in
+    `directory`, which is rebuilt first if missing or stale.
+    """
+    path = path or default_neighbors_path(directory)
+    if not is_fresh(directory, path):
+        sources = source_stats(directory)
+        write_neighbor_index(NeighborIndex.from_graph(graph), path, sources)
+    section, mapping = map_sections(path)
+    index = NeighborIndex(*(section(name) for name in NEIGHBOR_ARRAYS))
+    index.mapping = mapping
+    return index
+
+
+def as_array(values, typecode):
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+def align(size):
+    return (size + 7) & ~7
+
+
+if __name__ == "__main__":
+    main()
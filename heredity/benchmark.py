@@ -0,0 +1,66 @@
+import sys
+import timeit
+
+from heredity import (
+    PROBS, TRANSMISSION_PARENT_GENES, TRANSMISSION_VALS, assignments,
+    child_gene_probabilities, joint_probability, joint_probability_fast,
+    load_data
+)
+
+# Times each measurement is repeated; the fastest run is reported
+REPEAT = 5
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python benchmark.py data.csv")
+    people = load_data(sys.argv[1])
+    cases = list(assignments(people))
+
+    # Both implementations must agree before their speed is compared
+    for one_gene, two_genes, have_trait in cases:
+        slow = joint_probability(people, one_gene, two_genes, have_trait)
+        fast = joint_probability_fast(people, one_gene, two_genes, have_trait)
+        if abs(slow - fast) > 1e-15:
+            sys.exit("joint_probability_fast disagrees with joint_probability")
+
+    def run(function):
+        for one_gene, two_genes, have_trait in cases:
+            function(people, one_gene, two_genes, have_trait)
+
+    def lookup_dicts():
+        for mother in (0, 1, 2):
+            for father in (0, 1, 2):
+                for child in (0, 1, 2):
+                    TRANSMISSION_PARENT_GENES(
+                        TRANSMISSION_VALS(father), TRANSMISSION_VALS(mother), child
+                    )
+
+    def lookup_table():
+        table = child_gene_probabilities()
+        for mother in (0, 1, 2):
+            for father in (0, 1, 2):
+                for child in (0, 1, 2):
+                    table[mother][father][child]
+
+    report("child gene lookup (x27)", lookup_dicts, lookup_table, 10000)
+    report(f"joint probability (x{len(cases)})",
+           lambda: run(joint_probability), lambda: run(joint_probability_fast), 10)
+
+    # Changing the mutation rate must rebuild the table
+    mutation = PROBS["mutation"]
+    PROBS["mutation"] = 0.02
+    rebuilt = child_gene_probabilities()[0][0][1]
+    PROBS["mutation"] = mutation
+    print(f"Table rebuilt for mutation 0.02: P(1 | 0, 0) = {rebuilt:.4f}")
+
+
+def report(name, slow, fast, number):
+    slow_time = min(timeit.repeat(slow, number=number, repeat=REPEAT)) / number
+    fast_time = min(timeit.repeat(fast, number=number, repeat=REPEAT)) / number
+    print(f"{name}: {slow_time * 1e6:.1f}us -> {fast_time * 1e6:.1f}us "
+          f"({slow_time / fast_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@ import csv
 import itertools
 import sys
 
+from inference import child_gene_table, eliminate
+from sampling import gibbs, likelihood_weighting
+from vectorized import enumerate_vectorized
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -40,9 +44,40 @@ PROBS = {
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in (2, 3):
+        methods = "|".join(list(METHODS) + list(APPROXIMATE_METHODS))
+        sys.exit(f"Usage: python heredity.py data.csv [{methods}]")
     people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) == 3 else "enumerate"
+    if method in METHODS:
+        probabilities = METHODS[method](people)
+        errors = None
+    elif method in APPROXIMATE_METHODS:
+        try:
+            probabilities, errors = APPROXIMATE_METHODS[method](people)
+        except ValueError as e:
+            sys.exit(str(e))
+    else:
+        sys.exit(f"Unknown method: {method}")
+
+    # Print results, with standard errors for approximate methods
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                if errors is None:
+                    print(f"    {value}: {p:.4f}")
+                else:
+                    print(f"    {value}: {p:.4f} ± {errors[person][field][value]:.4f}")
+
+
+def enumerate_probabilities(people):
+    """
+    Compute every person's gene and trait distribution by enumerating
+    all joint assignments of genes and traits.
+    """
 
     # Keep track of gene and trait probabilities for each person
     probabilities = {
@@ -60,38 +95,22 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    # Loop over every assignment consistent with the known traits
+    for one_gene, two_genes, have_trait in assignments(people):
+        p = joint_probability_fast(people, one_gene, two_genes, have_trait)
+        update(probabilities, one_gene, two_genes, have_trait, p)
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+
+def eliminate_probabilities(people):
+    """
+    Compute every person's gene and trait distribution exactly by variable
+    elimination over the pedigree.
+    """
+    return eliminate(people, PROBS)
 
 
 def load_data(filename):
@@ -117,16 +136,29 @@ def load_data(filename):
     return data
 
 
-def powerset(s):
+def assignments(people):
     """
-    Return a list of all possible subsets of set s.
+    Yield every (one_gene, two_genes, have_trait) assignment of sets that
+    agrees with the known traits in `people`.
+
+    Known traits are fixed up front and only unknown traits are varied,
+    so no contradicting assignment is ever generated, and assignments
+    are produced one at a time rather than as lists of subsets.
     """
-    s = list(s)
-    return [
-        set(s) for s in itertools.chain.from_iterable(
-            itertools.combinations(s, r) for r in range(len(s) + 1)
-        )
-    ]
+    names = list(people)
+    known_trait = {
+        person for person in names if people[person]["trait"] is True
+    }
+    unknown = [person for person in names if people[person]["trait"] is None]
+
+    for traits in itertools.product((False, True), repeat=len(unknown)):
+        have_trait = known_trait | {
+            person for person, trait in zip(unknown, traits) if trait
+        }
+        for genes in itertools.product((0, 1, 2), repeat=len(names)):
+            one_gene = {person for person, gene in zip(names, genes) if gene == 1}
+            two_genes = {person for person, gene in zip(names, genes) if gene == 2}
+            yield one_gene, two_genes, have_trait
 
 
 def joint_probability(people, one_gene, two_genes, have_trait):
@@ -165,6 +197,52 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     return joint_prob_vals
 
 
+def joint_probability_fast(people, one_gene, two_genes, have_trait):
+    """
+    Compute and return the same joint probability as `joint_probability`,
+    looking up each child's gene probability in the precompiled
+    child-given-parents table instead of building dicts per call.
+    """
+    child_genes = child_gene_probabilities()
+    gene_probs = PROBS["gene"]
+    trait_probs = PROBS["trait"]
+
+    gene_dict = {}
+    for person in people:
+        gene_dict[person] = 2 if person in two_genes else 1 if person in one_gene else 0
+
+    joint_prob_vals = 1
+    for person, data in people.items():
+        has_trait = person in have_trait
+        if data["trait"] is not None and data["trait"] != has_trait:
+            return 0
+        gene = gene_dict[person]
+        joint_prob_vals *= trait_probs[gene][has_trait]
+        if data["mother"] is None and data["father"] is None:
+            joint_prob_vals *= gene_probs[gene]
+        else:
+            joint_prob_vals *= child_genes[gene_dict[data["mother"]]][gene_dict[data["father"]]][gene]
+    return joint_prob_vals
+
+
+# Table of P(child genes | mother genes, father genes), cached along with
+# the mutation rate it was built from
+CHILD_GENE_CACHE = {
+    "mutation": None,
+    "table": None
+}
+
+
+def child_gene_probabilities():
+    """
+    Return the precompiled `table[mother][father][child]` of child gene
+    probabilities, rebuilding it if `PROBS["mutation"]` has changed.
+    """
+    if CHILD_GENE_CACHE["mutation"] != PROBS["mutation"]:
+        CHILD_GENE_CACHE["table"] = child_gene_table(PROBS["mutation"])
+        CHILD_GENE_CACHE["mutation"] = PROBS["mutation"]
+    return CHILD_GENE_CACHE["table"]
+
 
 def TRANSMISSION_VALS(x):
     return {
@@ -212,5 +290,43 @@ def normalize(probabilities):
             probabilities[person]["trait"][j] /= trait_sum
 
 
+def vectorized_probabilities(people):
+    """
+    Compute every person's gene and trait distribution by enumeration,
+    evaluating assignments in NumPy batches.
+    """
+    return enumerate_vectorized(people, PROBS)
+
+
+def likelihood_weighting_probabilities(people):
+    """
+    Estimate every person's gene and trait distribution by likelihood
+    weighting. Returns (probabilities, standard errors).
+    """
+    return likelihood_weighting(people, PROBS)
+
+
+def gibbs_probabilities(people):
+    """
+    Estimate every person's gene and trait distribution by Gibbs
+    sampling. Returns (probabilities, standard errors).
+    """
+    return gibbs(people, PROBS)
+
+
+# Inference methods selectable from the command line
+METHODS = {
+    "enumerate": enumerate_probabilities,
+    "eliminate": eliminate_probabilities,
+    "vectorized": vectorized_probabilities
+}
+
+# Sampling methods, which also report standard errors
+APPROXIMATE_METHODS = {
+    "likelihood": likelihood_weighting_probabilities,
+    "gibbs": gibbs_probabilities
+}
+
+
 if __name__ == "__main__":
     main()
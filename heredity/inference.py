@@ -0,0 +1,201 @@
+import itertools
+
+# Number of copies of the gene a person can have
+GENES = (0, 1, 2)
+
+
+def child_gene_table(mutation):
+    """
+    Return `table[mother][father][child]`, the probability of a child
+    having `child` copies of the gene given their parents' copies.
+
+    Each parent passes on the gene with probability 1 - mutation if they
+    have two copies, 0.5 if they have one, and mutation if they have none.
+    """
+    passes = {2: 1 - mutation, 1: 0.5, 0: mutation}
+    table = []
+    for mother in GENES:
+        rows = []
+        for father in GENES:
+            m, f = passes[mother], passes[father]
+            rows.append([
+                (1 - m) * (1 - f),
+                m * (1 - f) + (1 - m) * f,
+                m * f
+            ])
+        table.append(rows)
+    return table
+
+
+class Factor():
+    """
+    Non-negative function of some people's gene counts, stored as a
+    table from assignments (tuples of gene counts, in `scope` order)
+    to values.
+    """
+
+    def __init__(self, scope, table):
+        self.scope = tuple(scope)
+        self.table = table
+
+    @classmethod
+    def constant(cls):
+        return cls((), {(): 1.0})
+
+    def multiply(self, other):
+        scope = self.scope + tuple(v for v in other.scope if v not in self.scope)
+        own = [scope.index(v) for v in self.scope]
+        others = [scope.index(v) for v in other.scope]
+        table = {}
+        for assignment in itertools.product(GENES, repeat=len(scope)):
+            table[assignment] = (
+                self.table[tuple(assignment[i] for i in own)]
+                * other.table[tuple(assignment[i] for i in others)]
+            )
+        return Factor(scope, table)
+
+    def marginal(self, keep):
+        """
+        Sum out every variable not in `keep`, normalizing the result so
+        repeated products over large pedigrees do not underflow.
+        """
+        scope = tuple(v for v in self.scope if v in keep)
+        positions = [self.scope.index(v) for v in scope]
+        table = {assignment: 0.0 for assignment in itertools.product(GENES, repeat=len(scope))}
+        for assignment, value in self.table.items():
+            table[tuple(assignment[i] for i in positions)] += value
+        total = sum(table.values())
+        if total > 0:
+            for assignment in table:
+                table[assignment] /= total
+        return Factor(scope, table)
+
+
+def person_factors(people, probs):
+    """
+    Return one factor per person: the probability of their gene count
+    given their parents' (or unconditionally for people without parents),
+    times the probability of their trait if it is known.
+    """
+    table = child_gene_table(probs["mutation"])
+    factors = {}
+    for person, data in people.items():
+        trait = data["trait"]
+
+        def evidence(gene):
+            return 1.0 if trait is None else probs["trait"][gene][trait]
+
+        mother, father = data["mother"], data["father"]
+        if mother is None and father is None:
+            factors[person] = Factor((person,), {
+                (gene,): probs["gene"][gene] * evidence(gene) for gene in GENES
+            })
+        else:
+            factors[person] = Factor((mother, father, person), {
+                (m, f, gene): table[m][f][gene] * evidence(gene)
+                for m, f, gene in itertools.product(GENES, repeat=3)
+            })
+    return factors
+
+
+def elimination_order(factors):
+    """
+    Order people for elimination greedily, always picking whoever has the
+    fewest neighbours in the (moralized) pedigree graph. For tree-like
+    pedigrees this keeps every clique to a family of parents and child.
+    """
+    neighbors = {person: set() for person in factors}
+    for factor in factors.values():
+        for person in factor.scope:
+            neighbors[person].update(v for v in factor.scope if v != person)
+
+    order = []
+    while neighbors:
+        person = min(neighbors, key=lambda p: (len(neighbors[p]), p))
+        adjacent = neighbors.pop(person)
+        for v in adjacent:
+            neighbors[v].discard(person)
+            neighbors[v].update(u for u in adjacent if u != v)
+        order.append(person)
+    return order
+
+
+def eliminate(people, probs):
+    """
+    Compute every person's gene and trait distribution exactly, using
+    variable elimination to build a junction tree over the pedigree and
+    two passes of message passing to calibrate it.
+
+    Returns probabilities in the same format as `heredity.main` builds.
+    Work is linear in the number of people when cliques stay small, as
+    they do for pedigrees without marriage loops.
+    """
+    factors = person_factors(people, probs)
+    order = elimination_order(factors)
+
+    # Upward pass: eliminating each person forms a clique from every
+    # factor and message mentioning them, and sends a message on to the
+    # clique that later consumes it
+    pool = [(None, factor) for factor in factors.values()]
+    cliques = []
+    for person in order:
+        used = [item for item in pool if person in item[1].scope]
+        pool = [item for item in pool if person not in item[1].scope]
+        psi = Factor.constant()
+        children = []
+        for source, factor in used:
+            if source is None:
+                psi = psi.multiply(factor)
+            else:
+                children.append(source)
+        scope = set(psi.scope)
+        for child in children:
+            scope.update(cliques[child]["message"].scope)
+        belief = psi
+        for child in children:
+            belief = belief.multiply(cliques[child]["message"])
+        message = belief.marginal(scope - {person})
+        c = len(cliques)
+        for child in children:
+            cliques[child]["parent"] = c
+        cliques.append({
+            "person": person,
+            "psi": psi,
+            "children": children,
+            "parent": None,
+            "message": message,
+            "down": Factor.constant()
+        })
+        pool.append((c, message))
+
+    # Downward pass, from the roots (created last) back to the leaves
+    marginals = {}
+    for c in reversed(range(len(cliques))):
+        clique = cliques[c]
+        incoming = [clique["down"]] + [
+            cliques[child]["message"] for child in clique["children"]
+        ]
+        belief = clique["psi"]
+        for message in incoming:
+            belief = belief.multiply(message)
+        marginals[clique["person"]] = belief.marginal({clique["person"]})
+
+        for n, child in enumerate(clique["children"]):
+            others = clique["psi"].multiply(clique["down"])
+            for m, sibling in enumerate(clique["children"]):
+                if m != n:
+                    others = others.multiply(cliques[sibling]["message"])
+            cliques[child]["down"] = others.marginal(set(cliques[child]["message"].scope))
+
+    probabilities = {}
+    for person, data in people.items():
+        gene = {g: marginals[person].table[(g,)] for g in (2, 1, 0)}
+        if data["trait"] is None:
+            has_trait = sum(gene[g] * probs["trait"][g][True] for g in GENES)
+        else:
+            has_trait = 1.0 if data["trait"] else 0.0
+        probabilities[person] = {
+            "gene": gene,
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return probabilities
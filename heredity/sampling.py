@@ -0,0 +1,304 @@
+import numpy as np
+
+from vectorized import Pedigree
+
+# Default total number of samples drawn
+SAMPLES = 100000
+
+# Likelihood-weighting samples are split into this many independent
+# batches, whose spread gives the standard error
+BATCHES = 20
+
+# Smallest share of a likelihood-weighting batch that must remain as
+# effective samples; below this a few samples carry most of the weight,
+# and neither the estimates nor their errors can be trusted
+MIN_EFFECTIVE_FRACTION = 0.1
+
+# Gibbs chains run side by side, and sweeps discarded before counting
+CHAINS = 100
+BURN_IN = 100
+
+
+def topological_order(pedigree):
+    """
+    Return person indices ordered so that parents come before children.
+    """
+    order = []
+    placed = np.zeros(len(pedigree), dtype=bool)
+    for person in range(len(pedigree)):
+        stack = [person]
+        while stack:
+            i = stack[-1]
+            if placed[i]:
+                stack.pop()
+                continue
+            parents = [
+                parent for parent in (pedigree.mother[i], pedigree.father[i])
+                if parent >= 0 and not placed[parent]
+            ]
+            if parents:
+                stack.extend(parents)
+            else:
+                placed[i] = True
+                order.append(i)
+                stack.pop()
+    return order
+
+
+def sample_categorical(probabilities, rng):
+    """
+    Draw one index along the last axis of an array of (not necessarily
+    normalized) probabilities.
+
+    The few categories are accumulated one column at a time, which is
+    much faster than NumPy's reductions along a short last axis.
+    """
+    columns = [probabilities[..., k] for k in range(probabilities.shape[-1])]
+    total = sum(columns)
+    u = rng.random(total.shape) * total
+    index = np.zeros(total.shape, dtype=np.int64)
+    cumulative = np.zeros(total.shape)
+    for column in columns[:-1]:
+        cumulative += column
+        index += u > cumulative
+    return index
+
+
+def log_evidence(pedigree):
+    """
+    Return an (n, 3) array of the log probability of each person's known
+    trait given each gene count, and zeros where the trait is unknown.
+    """
+    evidence = np.zeros((len(pedigree), 3))
+    known = pedigree.trait >= 0
+    evidence[known] = pedigree.log_trait[:, pedigree.trait[known]].T
+    return evidence
+
+
+def moral_colouring(pedigree):
+    """
+    Greedily colour the moral graph of the pedigree, in which people are
+    joined to their parents, children and co-parents. Returns a list of
+    index arrays, one per colour; people of one colour are independent
+    given everyone else, so Gibbs sampling can update them together.
+    """
+    n = len(pedigree)
+    neighbors = [set() for _ in range(n)]
+    for c in pedigree.children:
+        family = (pedigree.mother[c], pedigree.father[c], c)
+        for i in family:
+            neighbors[i].update(j for j in family if j != i)
+
+    colour = np.full(n, -1)
+    for i in sorted(range(n), key=lambda i: -len(neighbors[i])):
+        used = {colour[j] for j in neighbors[i]}
+        colour[i] = next(k for k in range(n) if k not in used)
+    return [np.flatnonzero(colour == k) for k in range(colour.max() + 1)]
+
+
+def trait_given_genes(pedigree, gene_probabilities):
+    """
+    Return the probability each person has the trait, given (..., n, 3)
+    gene probabilities: 0 or 1 where the trait is known, and otherwise
+    averaged over the gene distribution.
+    """
+    has_trait = gene_probabilities @ np.exp(pedigree.log_trait[:, 1])
+    known = pedigree.trait >= 0
+    has_trait[..., known] = pedigree.trait[known]
+    return has_trait
+
+
+def results(pedigree, genes, traits, gene_errors, trait_errors):
+    """
+    Return (probabilities, standard errors) dictionaries in the format
+    `heredity.main` prints, from per-person estimate arrays.
+    """
+    probabilities = {}
+    errors = {}
+    for i, person in enumerate(pedigree.names):
+        probabilities[person] = {
+            "gene": {gene: float(genes[i, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(traits[i]), False: float(1 - traits[i])}
+        }
+        errors[person] = {
+            "gene": {gene: float(gene_errors[i, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(trait_errors[i]), False: float(trait_errors[i])}
+        }
+    return probabilities, errors
+
+
+def likelihood_weighting(people, probs, samples=SAMPLES, batches=BATCHES,
+                         min_effective_fraction=MIN_EFFECTIVE_FRACTION,
+                         rng=None):
+    """
+    Estimate every person's gene and trait distribution by likelihood
+    weighting: genes are sampled from parents to children for all
+    samples at once. A person with a known trait draws their genes in
+    proportion to that evidence as well, and the sample's weight is
+    multiplied by how likely the evidence was given their parents.
+
+    Returns (probabilities, standard errors), with errors estimated from
+    the spread between `batches` independent batches of samples.
+
+    Evidence far from the founders still collapses the weights onto a
+    few samples in large pedigrees, where estimates and their errors are
+    both meaningless. Raises ValueError if the effective sample size of
+    any batch falls below `min_effective_fraction` of its samples; use
+    `gibbs` instead.
+    """
+    rng = rng or np.random.default_rng()
+    pedigree = Pedigree(people, probs)
+    n = len(pedigree)
+    per_batch = max(1, samples // batches)
+    prior = np.exp(pedigree.log_gene)
+    child = np.exp(pedigree.log_child)
+    evidence = np.exp(log_evidence(pedigree))
+    order = topological_order(pedigree)
+
+    gene_estimates = np.zeros((batches, n, 3))
+    for b in range(batches):
+        genes = np.zeros((per_batch, n), dtype=np.int64)
+        log_weights = np.zeros(per_batch)
+        for i in order:
+            if pedigree.mother[i] < 0:
+                distribution = np.broadcast_to(prior, (per_batch, 3))
+            else:
+                distribution = child[
+                    genes[:, pedigree.mother[i]], genes[:, pedigree.father[i]]
+                ]
+            if pedigree.trait[i] >= 0:
+                distribution = distribution * evidence[i]
+                with np.errstate(divide="ignore"):
+                    log_weights += np.log(distribution.sum(axis=1))
+            genes[:, i] = sample_categorical(distribution, rng)
+
+        if not np.isfinite(log_weights.max()):
+            raise ValueError("no sample is consistent with the evidence")
+        weights = np.exp(log_weights - log_weights.max())
+        weights /= weights.sum()
+        effective_samples = 1 / np.square(weights).sum()
+        if effective_samples < min_effective_fraction * per_batch:
+            raise ValueError(
+                f"likelihood weighting collapsed to {effective_samples:.1f} "
+                f"effective samples of {per_batch}; use Gibbs sampling"
+            )
+        one_hot = np.eye(3)[genes]
+        gene_estimates[b] = np.einsum("s,snk->nk", weights, one_hot)
+
+    trait_estimates = trait_given_genes(pedigree, gene_estimates)
+    return results(
+        pedigree,
+        gene_estimates.mean(axis=0),
+        trait_estimates.mean(axis=0),
+        gene_estimates.std(axis=0, ddof=1) / np.sqrt(batches),
+        trait_estimates.std(axis=0, ddof=1) / np.sqrt(batches)
+    )
+
+
+def gibbs(people, probs, samples=SAMPLES, chains=CHAINS, burn_in=BURN_IN,
+          rng=None):
+    """
+    Estimate every person's gene and trait distribution by Gibbs sampling,
+    running `chains` chains side by side. Each sweep resamples each
+    person's genes from their distribution given their parents, their
+    children (and co-parents) and their known trait. People are updated a
+    colour of the moral graph at a time, for all chains at once, so a
+    sweep costs a few array operations per colour rather than a loop over
+    people. Samples are the sweeps after `burn_in`, `samples` in total
+    across chains, so work grows with people times sweeps.
+
+    Estimates average each person's conditional distribution rather than
+    their sampled genes, which lowers variance. Returns (probabilities,
+    standard errors), with errors from the spread between chains.
+    """
+    rng = rng or np.random.default_rng()
+    pedigree = Pedigree(people, probs)
+    n = len(pedigree)
+    chains = max(2, chains)
+    sweeps = max(1, samples // chains)
+    evidence = log_evidence(pedigree)
+
+    # Rows of three log probabilities, one per gene count: a child's
+    # genes given row mother * 3 + father, and a child's probability
+    # given each of a parent's gene counts, at row
+    # role * 9 + co-parent * 3 + child for mothers (0) and fathers (1)
+    log_child_rows = pedigree.log_child.reshape(9, 3)
+    log_parent_rows = np.stack([
+        pedigree.log_child.transpose(1, 2, 0),
+        pedigree.log_child.transpose(0, 2, 1)
+    ]).reshape(18, 3)
+
+    # Every (parent, child) pair, with the parent's role and co-parent
+    children = pedigree.children
+    parents = np.r_[pedigree.mother[children], pedigree.father[children]]
+    roles = np.repeat([0, 1], len(children))
+    co_parents = np.r_[pedigree.father[children], pedigree.mother[children]]
+    children = np.r_[children, children]
+
+    groups = []
+    for members in moral_colouring(pedigree):
+        founder = pedigree.mother[members] < 0
+        mothers = pedigree.mother[members[~founder]]
+        fathers = pedigree.father[members[~founder]]
+
+        # The pairs whose parent has this colour, ordered by parent and
+        # split into layers holding at most one child of each parent, so
+        # each layer's terms can be added to the parents without overlap
+        edges = np.flatnonzero(np.isin(parents, members))
+        edges = edges[np.argsort(parents[edges], kind="stable")]
+        position = np.searchsorted(members, parents[edges])
+        _, starts, counts = np.unique(position, return_index=True, return_counts=True)
+        rank = np.arange(len(edges)) - np.repeat(starts, counts)
+        layers = [
+            (position[rank == k], np.flatnonzero(rank == k))
+            for k in range(rank.max() + 1 if len(edges) else 0)
+        ]
+        groups.append((
+            members, founder, mothers, fathers, layers,
+            roles[edges] * 9, co_parents[edges], children[edges],
+            np.zeros((len(members), chains, 3))
+        ))
+
+    # Genes are stored person by person, so gathering people is a copy
+    # of whole rows; each chain starts from a draw of the prior
+    genes = np.zeros((n, chains), dtype=np.int64)
+    for i in topological_order(pedigree):
+        if pedigree.mother[i] < 0:
+            log_p = np.broadcast_to(pedigree.log_gene, (chains, 3))
+        else:
+            log_p = log_child_rows[genes[pedigree.mother[i]] * 3 + genes[pedigree.father[i]]]
+        genes[i] = sample_categorical(np.exp(log_p), rng)
+
+    for sweep in range(burn_in + sweeps):
+        for (members, founder, mothers, fathers, layers,
+             edge_roles, edge_co_parents, edge_children, totals) in groups:
+            log_p = np.empty((len(members), chains, 3))
+            log_p[founder] = pedigree.log_gene
+            log_p[~founder] = log_child_rows[genes[mothers] * 3 + genes[fathers]]
+            log_p += evidence[members][:, None, :]
+            if layers:
+                terms = log_parent_rows[
+                    edge_roles[:, None] + genes[edge_co_parents] * 3 + genes[edge_children]
+                ]
+                for positions, layer in layers:
+                    log_p[positions] += terms[layer]
+
+            largest = np.maximum(np.maximum(log_p[..., 0], log_p[..., 1]), log_p[..., 2])
+            conditional = np.exp(log_p - largest[..., None])
+            total = conditional[..., 0] + conditional[..., 1] + conditional[..., 2]
+            conditional /= total[..., None]
+            genes[members] = sample_categorical(conditional, rng)
+            if sweep >= burn_in:
+                totals += conditional
+
+    gene_estimates = np.zeros((chains, n, 3))
+    for members, *_, totals in groups:
+        gene_estimates[:, members] = totals.transpose(1, 0, 2) / sweeps
+    trait_estimates = trait_given_genes(pedigree, gene_estimates)
+    return results(
+        pedigree,
+        gene_estimates.mean(axis=0),
+        trait_estimates.mean(axis=0),
+        gene_estimates.std(axis=0, ddof=1) / np.sqrt(chains),
+        trait_estimates.std(axis=0, ddof=1) / np.sqrt(chains)
+    )
@@ -0,0 +1,132 @@
+import numpy as np
+
+from inference import child_gene_table
+
+# Assignments evaluated together per batch
+BATCH_SIZE = 2 ** 16
+
+
+class Pedigree():
+    """
+    People of a `load_data` dictionary encoded as integer arrays, with the
+    model's probabilities as log-space lookup tables.
+    """
+
+    def __init__(self, people, probs):
+        self.names = list(people)
+        index = {person: i for i, person in enumerate(self.names)}
+        self.mother = np.array(
+            [index.get(people[person]["mother"], -1) for person in self.names]
+        )
+        self.father = np.array(
+            [index.get(people[person]["father"], -1) for person in self.names]
+        )
+        self.founders = np.flatnonzero(self.mother < 0)
+        self.children = np.flatnonzero(self.mother >= 0)
+
+        # Known traits as 0 or 1, and -1 where unknown
+        self.trait = np.array([
+            -1 if people[person]["trait"] is None else int(people[person]["trait"])
+            for person in self.names
+        ])
+        self.unknown = np.flatnonzero(self.trait < 0)
+
+        with np.errstate(divide="ignore"):
+            self.log_gene = np.log([probs["gene"][gene] for gene in (0, 1, 2)])
+            self.log_child = np.log(child_gene_table(probs["mutation"]))
+            self.log_trait = np.log([
+                [probs["trait"][gene][False], probs["trait"][gene][True]]
+                for gene in (0, 1, 2)
+            ])
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def num_assignments(self):
+        return 3 ** len(self) * 2 ** len(self.unknown)
+
+    def log_joint(self, genes, traits):
+        """
+        Return the log joint probability of each row of a batch of
+        assignments: `genes` and `traits` are (batch, people) integer
+        arrays of gene counts and 0/1 traits.
+        """
+        founders, children = self.founders, self.children
+        log_p = self.log_gene[genes[:, founders]].sum(axis=1)
+        log_p += self.log_child[
+            genes[:, self.mother[children]],
+            genes[:, self.father[children]],
+            genes[:, children]
+        ].sum(axis=1)
+        log_p += self.log_trait[genes, traits].sum(axis=1)
+        return log_p
+
+    def decode(self, start, end):
+        """
+        Return the (genes, traits) arrays for assignments numbered `start`
+        to `end`, covering every gene count and every unknown trait while
+        keeping known traits fixed.
+        """
+        numbers = np.arange(start, end, dtype=np.int64)
+        genes = np.empty((len(numbers), len(self)), dtype=np.int64)
+        for i in range(len(self)):
+            genes[:, i] = numbers % 3
+            numbers //= 3
+        traits = np.broadcast_to(self.trait, genes.shape).copy()
+        for i in self.unknown:
+            traits[:, i] = numbers % 2
+            numbers //= 2
+        return genes, traits
+
+
+def enumerate_vectorized(people, probs, batch_size=BATCH_SIZE):
+    """
+    Compute every person's gene and trait distribution exactly by
+    evaluating all assignments consistent with the known traits in NumPy
+    batches, in log space, and scatter-adding each batch's weights into
+    per-person totals.
+
+    Returns probabilities in the same format as `heredity.main` builds.
+    """
+    pedigree = Pedigree(people, probs)
+    n = len(pedigree)
+    gene_totals = np.zeros(n * 3)
+    trait_totals = np.zeros(n * 2)
+    offset = -np.inf
+    people_index = np.arange(n)
+
+    for start in range(0, pedigree.num_assignments, batch_size):
+        end = min(start + batch_size, pedigree.num_assignments)
+        genes, traits = pedigree.decode(start, end)
+        log_p = pedigree.log_joint(genes, traits)
+
+        # Keep totals scaled by the largest log probability seen so far
+        batch_max = log_p.max()
+        if batch_max == -np.inf:
+            continue
+        if batch_max > offset:
+            scale = np.exp(offset - batch_max)
+            gene_totals *= scale
+            trait_totals *= scale
+            offset = batch_max
+        weights = np.repeat(np.exp(log_p - offset), n)
+
+        gene_totals += np.bincount(
+            (people_index * 3 + genes).ravel(), weights, minlength=n * 3
+        )
+        trait_totals += np.bincount(
+            (people_index * 2 + traits).ravel(), weights, minlength=n * 2
+        )
+
+    genes = gene_totals.reshape(n, 3)
+    genes /= genes.sum(axis=1, keepdims=True)
+    traits = trait_totals.reshape(n, 2)
+    traits /= traits.sum(axis=1, keepdims=True)
+    return {
+        person: {
+            "gene": {gene: float(genes[i, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(traits[i, 1]), False: float(traits[i, 0])}
+        }
+        for i, person in enumerate(pedigree.names)
+    }
@@ -0,0 +1,120 @@
+import sys
+import time
+
+import numpy as np
+
+from pagerank import (
+    DAMPING, SAMPLES, iterate_pagerank, iterate_pagerank_sparse,
+    sample_pagerank, sample_pagerank_vectorized
+)
+from power import ConvergenceTrace
+
+# Corpus sizes benchmarked when none are given
+SIZES = (100, 1000, 10000)
+
+# Average number of links per page in synthetic corpora
+MEAN_LINKS = 8
+
+# Power-law exponent of the page popularity used to pick link targets
+EXPONENT = 1.1
+
+# The pure-Python methods are skipped on corpora larger than these
+MAX_ITERATE_PAGES = 100000
+MAX_SAMPLE_PAGES = 10000
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'pages':>8} {'method':<20} {'seconds':>9} {'iterations':>10} {'L1 error':>9}")
+    for size in sizes:
+        for result in run_benchmark(size):
+            iterations = result["iterations"]
+            print(f"{size:>8} {result['method']:<20} {result['seconds']:>9.4f} "
+                  f"{'' if iterations is None else iterations:>10} "
+                  f"{result['error']:>9.5f}")
+
+
+def generate_corpus(num_pages, mean_links=MEAN_LINKS, exponent=EXPONENT, seed=0):
+    """
+    Return a synthetic corpus of `num_pages` pages, in the same format as
+    `crawl`, whose links follow a power law: a few pages are linked to by
+    very many others. Out-degrees are geometric with mean `mean_links`,
+    so some pages are dangling.
+    """
+    rng = np.random.default_rng(seed)
+    popularity = np.arange(1, num_pages + 1, dtype=np.float64) ** -exponent
+    popularity /= popularity.sum()
+    out_degree = rng.geometric(1 / (mean_links + 1), size=num_pages) - 1
+    targets = rng.choice(num_pages, size=out_degree.sum(), p=popularity)
+    pages = [f"{i}.html" for i in rng.permutation(num_pages)]
+
+    corpus = {}
+    start = 0
+    for i, degree in enumerate(out_degree):
+        links = targets[start:start + degree]
+        start += degree
+        corpus[pages[i]] = set(pages[j] for j in links if j != i)
+    return corpus
+
+
+def l1_error(ranks, reference):
+    """
+    Return the L1 distance between two PageRank dictionaries.
+    """
+    return sum(abs(ranks[page] - reference[page]) for page in reference)
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_benchmark(num_pages, samples=SAMPLES, damping_factor=DAMPING):
+    """
+    Time each PageRank method on a synthetic corpus of `num_pages` pages.
+    Returns a list of dicts with the method name, seconds, iterations
+    (for iterative methods) and L1 error against the sparse engine
+    run to tight tolerance.
+    """
+    corpus = generate_corpus(num_pages)
+    results = []
+
+    trace = ConvergenceTrace()
+    reference, seconds = timed(
+        iterate_pagerank_sparse, corpus, damping_factor, trace=trace
+    )
+    results.append({
+        "method": "iterate_sparse", "seconds": seconds,
+        "iterations": trace.iterations, "error": 0.0
+    })
+
+    if num_pages <= MAX_ITERATE_PAGES:
+        trace = ConvergenceTrace()
+        ranks, seconds = timed(
+            iterate_pagerank, corpus, damping_factor, trace=trace
+        )
+        results.append({
+            "method": "iterate", "seconds": seconds,
+            "iterations": trace.iterations, "error": l1_error(ranks, reference)
+        })
+
+    if num_pages <= MAX_SAMPLE_PAGES:
+        ranks, seconds = timed(sample_pagerank, corpus, damping_factor, samples)
+        results.append({
+            "method": "sample", "seconds": seconds,
+            "iterations": None, "error": l1_error(ranks, reference)
+        })
+
+    ranks, seconds = timed(
+        sample_pagerank_vectorized, corpus, damping_factor, samples
+    )
+    results.append({
+        "method": "sample_vectorized", "seconds": seconds,
+        "iterations": None, "error": l1_error(ranks, reference)
+    })
+    return results
+
+
+if __name__ == "__main__":
+    main()
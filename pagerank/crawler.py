@@ -0,0 +1,182 @@
+import json
+import mmap
+import multiprocessing
+import os
+import re
+import sys
+
+LINK_PATTERN = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Name of the per-directory cache of parsed links used from the command line
+CACHE_NAME = ".crawl-cache.json"
+
+# Files handed to each worker at a time
+CHUNKSIZE = 16
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python crawler.py corpus [edges.tsv]")
+    edges = crawl_edges(sys.argv[1], cache_path=default_cache_path(sys.argv[1]))
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            count = write_edges(edges, f)
+    else:
+        count = write_edges(edges, sys.stdout)
+    print(f"{count} links.", file=sys.stderr)
+
+
+def parse_file(path):
+    """
+    Return the (mtime_ns, size, links) of an HTML file, reading it through
+    a memory map rather than into a string.
+    """
+    stat = os.stat(path)
+    links = []
+    if stat.st_size:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                links = [
+                    link.decode("utf-8", "replace")
+                    for link in LINK_PATTERN.findall(contents)
+                ]
+    return stat.st_mtime_ns, stat.st_size, links
+
+
+def parse_entry(entry):
+    directory, filename = entry
+    return filename, parse_file(os.path.join(directory, filename))
+
+
+class CrawlCache():
+    """
+    Parsed links of each file, keyed by filename and stamped with the
+    file's mtime and size so unchanged files need not be parsed again.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.files = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f)
+
+    def get(self, filename, stat):
+        """
+        Returns the cached links for `filename` if its `stat` is unchanged,
+        otherwise None.
+        """
+        entry = self.files.get(filename)
+        if entry is None:
+            return None
+        if entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        return entry["links"]
+
+    def put(self, filename, mtime, size, links):
+        self.files[filename] = {"mtime": mtime, "size": size, "links": links}
+
+    def save(self, filenames):
+        """
+        Write the cache, keeping only entries for `filenames`.
+        """
+        if self.path is None:
+            return
+        self.files = {
+            filename: entry for filename, entry in self.files.items()
+            if filename in filenames
+        }
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.files, f)
+        os.replace(temporary, self.path)
+
+
+def default_cache_path(directory):
+    return os.path.join(directory, CACHE_NAME)
+
+
+def crawl_links(directory, processes=None, cache_path=None):
+    """
+    Yield (page, links) for every HTML page in `directory`, where links
+    are all hrefs found in the page.
+
+    Pages are parsed on a pool of `processes` worker processes and
+    yielded as they finish. Given a `cache_path`, pages unchanged since
+    they were cached there are answered from the cache instead, and the
+    cache is rewritten once the crawl completes; without one nothing is
+    cached.
+    """
+    cache = CrawlCache(cache_path)
+    filenames = sorted(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+
+    stale = []
+    for filename in filenames:
+        links = cache.get(filename, os.stat(os.path.join(directory, filename)))
+        if links is None:
+            stale.append((directory, filename))
+        else:
+            yield filename, links
+
+    if processes == 1 or len(stale) <= 1:
+        parsed = map(parse_entry, stale)
+        for filename, (mtime, size, links) in parsed:
+            cache.put(filename, mtime, size, links)
+            yield filename, links
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            parsed = pool.imap_unordered(parse_entry, stale, CHUNKSIZE)
+            for filename, (mtime, size, links) in parsed:
+                cache.put(filename, mtime, size, links)
+                yield filename, links
+
+    cache.save(set(filenames))
+
+
+def crawl_edges(directory, processes=None, cache_path=None):
+    """
+    Yield (page, linked page) edges between pages of `directory` as pages
+    are parsed. Self-links and links leaving the corpus are dropped.
+    """
+    pages = set(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+    for page, links in crawl_links(directory, processes, cache_path):
+        for link in set(links) - {page}:
+            if link in pages:
+                yield page, link
+
+
+def crawl_parallel(directory, processes=None, cache_path=None):
+    """
+    Parse a directory of HTML pages in parallel, like `pagerank.crawl`.
+    Return a dictionary where each key is a page, and values are
+    a set of all other pages in the corpus that are linked to by the page.
+    """
+    corpus = {
+        filename: set() for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    }
+    for page, link in crawl_edges(directory, processes, cache_path):
+        corpus[page].add(link)
+    return corpus
+
+
+def write_edges(edges, f):
+    """
+    Write edges to a file object as tab-separated lines, returning how
+    many were written.
+    """
+    count = 0
+    for page, link in edges:
+        f.write(f"{page}\t{link}\n")
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    main()
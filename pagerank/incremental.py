@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+from crawler import parse_file
+from linkgraph import LinkGraph
+from power import MAX_ITERATIONS, TOLERANCE, power_iteration
+
+DAMPING = 0.85
+
+# Default name of the per-directory saved ranking state
+STATE_NAME = ".pagerank-state.json"
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python incremental.py corpus")
+    directory = sys.argv[1]
+    state_path = os.path.join(directory, STATE_NAME)
+
+    ranking = IncrementalPageRank.load(directory, state_path, DAMPING)
+    changes = ranking.update()
+    ranking.save(state_path)
+
+    print(f"Added {len(changes['added'])}, removed {len(changes['removed'])}, "
+          f"modified {len(changes['modified'])} pages")
+    print(f"PageRank Results from Iteration")
+    for page, rank in sorted(ranking.ranks.items()):
+        print(f"  {page}: {rank:.4f}")
+
+
+class IncrementalPageRank():
+    """
+    PageRank for a corpus directory that is kept up to date as files are
+    added, removed or modified.
+
+    Each `update` re-parses only the files whose mtime or size changed,
+    patches the stored links, and warm-starts power iteration from the
+    previous ranks, which are usually already close to the new ones.
+    """
+
+    def __init__(self, directory, damping_factor=DAMPING):
+        self.directory = directory
+        self.damping_factor = damping_factor
+
+        # Maps each page to its (mtime_ns, size) and to all pages it links
+        # to, including ones not (yet) in the corpus
+        self.stamps = {}
+        self.links = {}
+        self.ranks = {}
+
+    @classmethod
+    def load(cls, directory, path, damping_factor=DAMPING):
+        """
+        Restore saved state from `path`, or start fresh if there is none.
+        """
+        ranking = cls(directory, damping_factor)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            ranking.stamps = {page: tuple(stamp) for page, stamp in state["stamps"].items()}
+            ranking.links = {page: set(links) for page, links in state["links"].items()}
+            ranking.ranks = state["ranks"]
+        return ranking
+
+    def save(self, path):
+        state = {
+            "stamps": self.stamps,
+            "links": {page: sorted(links) for page, links in self.links.items()},
+            "ranks": self.ranks
+        }
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temporary, path)
+
+    def scan(self):
+        """
+        Compare the directory with the stored stamps. Returns a dict of
+        sorted "added", "removed" and "modified" page lists.
+        """
+        current = {}
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".html"):
+                stat = os.stat(os.path.join(self.directory, filename))
+                current[filename] = (stat.st_mtime_ns, stat.st_size)
+        return {
+            "added": sorted(set(current) - set(self.stamps)),
+            "removed": sorted(set(self.stamps) - set(current)),
+            "modified": sorted(
+                page for page in current
+                if page in self.stamps and self.stamps[page] != current[page]
+            )
+        }
+
+    def update(self, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+        """
+        Bring links and ranks up to date with the directory. Returns the
+        changes found, as from `scan`. Ranks are left untouched if nothing
+        changed.
+        """
+        changes = self.scan()
+        if not any(changes.values()) and self.ranks:
+            return changes
+
+        for page in changes["removed"]:
+            del self.stamps[page]
+            del self.links[page]
+        for page in changes["added"] + changes["modified"]:
+            mtime, size, links = parse_file(os.path.join(self.directory, page))
+            self.stamps[page] = (mtime, size)
+            self.links[page] = set(links) - {page}
+
+        # Links to pages outside the corpus are dropped when building the
+        # graph, so links to newly added pages take effect automatically
+        graph = LinkGraph.from_corpus(self.links)
+        start = None
+        if self.ranks and len(graph):
+            # Carry over previous ranks; new pages start at the uniform rank
+            uniform = 1 / len(graph)
+            start = np.array([self.ranks.get(page, uniform) for page in graph.pages])
+        if len(graph):
+            self.ranks = graph.ranks_dict(power_iteration(
+                graph, self.damping_factor, tolerance, max_iterations, start
+            ))
+        else:
+            self.ranks = {}
+        return changes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+from scipy import sparse
+
+
+class LinkGraph():
+    """
+    Link structure of a corpus with pages interned to dense integers.
+
+    Outgoing links are stored in CSR form: the pages linked to by page `i`
+    are `indices[indptr[i]:indptr[i + 1]]`. Pages with no outgoing links
+    are dangling; a surfer on one jumps to any page uniformly at random.
+    """
+
+    def __init__(self, pages, indptr, indices):
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.out_degree = np.diff(self.indptr)
+        self.dangling = self.out_degree == 0
+        self._matrix = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build a graph from a `crawl` corpus dict of page -> set of links.
+        Links to pages outside the corpus are ignored.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        indptr = np.zeros(len(pages) + 1, dtype=np.int64)
+        indices = []
+        for i, page in enumerate(pages):
+            targets = sorted(index[link] for link in corpus[page] if link in index)
+            indices.extend(targets)
+            indptr[i + 1] = len(indices)
+        return cls(pages, indptr, indices)
+
+    @classmethod
+    def from_edges(cls, pages, sources, targets):
+        """
+        Build a graph from parallel arrays of (source, target) page indices.
+        Duplicate edges are collapsed.
+        """
+        n = len(pages)
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n)
+        )
+        adjacency.sum_duplicates()
+        adjacency.sort_indices()
+        return cls(pages, adjacency.indptr, adjacency.indices)
+
+    def __len__(self):
+        return len(self.pages)
+
+    @property
+    def num_links(self):
+        return len(self.indices)
+
+    def links(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def transition_matrix(self):
+        """
+        Returns the sparse n x n matrix `M` with `M[j, i]` the probability
+        of following a link from page `i` to page `j`, so that one step of
+        link-following is `M @ ranks`. Dangling columns are all zero and
+        handled separately by callers.
+        """
+        if self._matrix is None:
+            n = len(self)
+            sources = np.repeat(np.arange(n), self.out_degree)
+            weights = 1 / self.out_degree[sources]
+            self._matrix = sparse.csr_matrix(
+                (weights, (self.indices, sources)), shape=(n, n)
+            )
+        return self._matrix
+
+    def distribution(self, weights):
+        """
+        Returns a probability vector over pages from either a collection
+        of pages (weighted equally) or a dict of page -> weight. Pages not
+        in the graph are ignored.
+        """
+        if not isinstance(weights, dict):
+            weights = {page: 1 for page in weights}
+        vector = np.zeros(len(self))
+        for page, weight in weights.items():
+            if page in self.index:
+                vector[self.index[page]] = weight
+        total = vector.sum()
+        if total <= 0:
+            raise ValueError("personalization has no weight on any page")
+        return vector / total
+
+    def ranks_dict(self, ranks):
+        """
+        Returns a page -> rank dict for a rank vector over this graph.
+        """
+        return dict(zip(self.pages, ranks.tolist()))
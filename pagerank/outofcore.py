@@ -0,0 +1,186 @@
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+from crawler import crawl_edges
+from power import MAX_ITERATIONS, TOLERANCE
+
+DAMPING = 0.85
+
+MAGIC = b"PREDGES1"
+HEADER = struct.Struct("<8sQQ")
+
+# Edges are stored as (destination, source) page index pairs
+EDGE_DTYPE = np.dtype([("dst", "<i4"), ("src", "<i4")])
+
+# Edges converted to arrays at a time while writing an edge file
+BATCH_EDGES = 2 ** 20
+
+# Pages per destination range when bucketing edges for sorting; each
+# bucket is sorted in memory on its own
+BUCKET_PAGES = 2 ** 20
+
+# Edges streamed from disk per step of an iteration
+CHUNK_EDGES = 2 ** 22
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python outofcore.py corpus edges.bin")
+    build_edge_file(sys.argv[1], sys.argv[2])
+    edge_file = EdgeFile(sys.argv[2])
+    ranks = out_of_core_pagerank(edge_file, DAMPING)
+    print(f"PageRank Results from Out-of-Core Iteration")
+    for page, rank in sorted(zip(edge_file.pages, ranks.tolist())):
+        print(f"  {page}: {rank:.4f}")
+
+
+def pages_path(path):
+    return f"{path}.pages"
+
+
+def build_edge_file(directory, path, processes=None):
+    """
+    Crawl `directory` and write its links to an edge file at `path`.
+    """
+    pages = sorted(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+    write_edge_file(path, pages, crawl_edges(directory, processes))
+
+
+def write_edge_file(path, pages, edges, bucket_pages=BUCKET_PAGES):
+    """
+    Write (page, linked page) `edges` between `pages` to a binary edge
+    file at `path`, sorted by destination page, with page names alongside
+    in a text file.
+
+    Edges are streamed: they are first spread over temporary bucket files
+    by destination range, and then each bucket is sorted in memory and
+    appended, so the whole edge list never needs to fit in memory.
+    """
+    n = len(pages)
+    index = {page: i for i, page in enumerate(pages)}
+    num_buckets = max(1, -(-n // bucket_pages))
+    out_degree = np.zeros(n, dtype=np.int64)
+    num_edges = 0
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as scratch:
+        buckets = [
+            open(os.path.join(scratch, f"{b}.bin"), "wb")
+            for b in range(num_buckets)
+        ]
+        batch = []
+
+        def flush():
+            records = np.array(batch, dtype=EDGE_DTYPE)
+            out_degree[:] += np.bincount(records["src"], minlength=n)
+            bucket_of = records["dst"] // bucket_pages
+            for b in np.unique(bucket_of):
+                records[bucket_of == b].tofile(buckets[b])
+            batch.clear()
+
+        for page, link in edges:
+            batch.append((index[link], index[page]))
+            if len(batch) >= BATCH_EDGES:
+                num_edges += len(batch)
+                flush()
+        if batch:
+            num_edges += len(batch)
+            flush()
+        for bucket in buckets:
+            bucket.close()
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, n, num_edges))
+            out_degree.astype("<i4").tofile(f)
+            for b in range(num_buckets):
+                records = np.fromfile(os.path.join(scratch, f"{b}.bin"), dtype=EDGE_DTYPE)
+                records[np.argsort(records["dst"], kind="stable")].tofile(f)
+        os.replace(temporary, path)
+
+    with open(pages_path(path), "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(f"{page}\n")
+
+
+class EdgeFile():
+    """
+    Memory-mapped edge file written by `write_edge_file`. Only the page
+    names and out-degrees are held in memory; edges are read from disk
+    in chunks as they are needed.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, self.num_pages, self.num_edges = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("not a PageRank edge file")
+        self.out_degree = np.fromfile(
+            path, dtype="<i4", count=self.num_pages, offset=HEADER.size
+        )
+        self.edges = np.memmap(
+            path, dtype=EDGE_DTYPE, mode="r", shape=(self.num_edges,),
+            offset=HEADER.size + 4 * self.num_pages
+        )
+        with open(pages_path(path), encoding="utf-8") as f:
+            self.pages = f.read().splitlines()
+
+    def __len__(self):
+        return self.num_pages
+
+    def chunks(self, chunk_edges=CHUNK_EDGES):
+        for start in range(0, self.num_edges, chunk_edges):
+            yield self.edges[start:start + chunk_edges]
+
+
+def out_of_core_pagerank(edge_file, damping_factor, tolerance=TOLERANCE,
+                         max_iterations=MAX_ITERATIONS,
+                         chunk_edges=CHUNK_EDGES, trace=None):
+    """
+    Return the PageRank vector of an EdgeFile, in the order of its pages,
+    by power iteration that streams through the edges once per iteration.
+
+    Because edges are sorted by destination, each chunk only touches a
+    contiguous range of the new rank vector.
+    """
+    n = len(edge_file)
+    out_degree = edge_file.out_degree
+    dangling = out_degree == 0
+    linked = ~dangling
+    ranks = np.full(n, 1 / n)
+    shares = np.zeros(n)
+
+    if trace is not None:
+        trace.start()
+    for _ in range(max_iterations):
+        shares[linked] = ranks[linked] / out_degree[linked]
+        ranks_next = np.zeros(n)
+        for chunk in edge_file.chunks(chunk_edges):
+            dst = chunk["dst"]
+            low, high = dst[0], dst[-1] + 1
+            ranks_next[low:high] += np.bincount(
+                dst - low, weights=shares[chunk["src"]], minlength=high - low
+            )
+        dangling_rank = ranks[dangling].sum()
+        ranks_next *= damping_factor
+        ranks_next += (damping_factor * dangling_rank + 1 - damping_factor) / n
+        change = np.abs(ranks_next - ranks).sum()
+        ranks = ranks_next
+        if trace is not None:
+            trace.record(change)
+        if change < tolerance:
+            if trace is not None:
+                trace.converged = True
+            break
+
+    return ranks
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,14 @@ import re
 import sys
 import numpy as np
 
+from linkgraph import LinkGraph
+from partitioned import partitioned_power_iteration
+from power import (
+    MAX_ITERATIONS, TOLERANCE, personalized_power_iteration, power_iteration
+)
+from sampler import SURFERS, sample_ranks
+from transition import TransitionModel
+
 DAMPING = 0.85
 SAMPLES = 10000
 
@@ -108,80 +116,94 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    pages = list(corpus)
-    pagerank_total = {page:0 for page in pages}
+    model = TransitionModel(corpus, damping_factor)
+    pages = model.pages
+    visits = [0] * len(pages)
 
-    # initialise loop
-    current_page = pages[random.randint(0, len(pages) - 1)]
-    if current_page in pages:
-        pagerank_total[current_page] += 1
-    else:
-        raise "Unrecognized Page"
-
-    #initialise set of transition models for small sample sets
-    if len(pages) < 5000:
-        model_set = dict()
-        for page in pages:
-            model_set[page] = transition_model(corpus, page, damping_factor)
+    # initialise loop at a random page
+    current_page = random.randrange(len(pages))
+    visits[current_page] += 1
 
     # start of n loops, n-1 due to initialisation.
-    rng = np.random.default_rng()
     for i in range(n - 1):
-        if len(pages) < 5000:
-            sample_model = model_set.get(current_page)
-        else:
-            sample_model = transition_model(corpus, current_page, damping_factor)
-        page_prob_dist = [sample_model[page] for page in pages]
-        current_page = rng.choice(pages, p=page_prob_dist) # random based on give probability
-        if current_page in pages:
-            pagerank_total[current_page] += 1
-        else:
-            raise "Unrecognized Page" # sanity check lest wrong page
+        current_page = model.next_page(current_page)
+        visits[current_page] += 1
 
     # makes sum of views into probability format
-    pagerank_prob = {key: value / n for key, value in pagerank_total.items()}
+    pagerank_prob = {page: visits[i] / n for i, page in enumerate(pages)}
 
     if round(sum(pagerank_prob.values()), 5) == 1:
         return pagerank_prob
     else:
         raise ValueError
 
-def iterate_pagerank(corpus, damping_factor):
+def sample_pagerank_vectorized(corpus, damping_factor, n, surfers=SURFERS):
+    """
+    Return PageRank values for each page from `n` samples, like
+    `sample_pagerank`, but walking `surfers` random surfers at once
+    with NumPy instead of one page per step.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    return graph.ranks_dict(sample_ranks(graph, damping_factor, n, surfers))
+
+
+def iterate_pagerank(corpus, damping_factor, trace=None):
     """
     Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    PageRank values until convergence. If a ConvergenceTrace is given as
+    `trace`, each iteration's largest change in rank is recorded in it.
 
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
     pages = list(corpus)
-    # pages with no links == link to all pages
-    for key, value in corpus.items():
-        if len(value) == 0:
-            corpus[key] = set(pages)
-    links = list(corpus.values())
-
-    # produces a list of incoming links for each page in corpus
-    incoming_links = []
-    for page in pages:
-        inner = []
-        for key, value in corpus.items():
-            if page in value:
-                inner.append(key)
-        incoming_links.append(inner)
-    incoming_links = [[pages.index(j) for j in incoming_links[i]] for i in range(len(incoming_links))]
+    index = {page: i for i, page in enumerate(pages)}
+    num_pages = len(pages)
+
+    # produces a list of incoming links for each page in corpus, in one pass
+    # over the links; `corpus` itself is only read, never modified
+    incoming_links = [[] for page in pages]
+    numlink = [0] * num_pages
+    for i, page in enumerate(pages):
+        for link in corpus[page]:
+            if link in index:
+                incoming_links[index[link]].append(i)
+                numlink[i] += 1
+
+    # pages with no links are treated as linking to all pages, which adds
+    # the same share of their rank to every page, so only their total is
+    # needed rather than a full set of links for each
+    dangling = [i for i in range(num_pages) if numlink[i] == 0]
 
     # initialise values for pagerank
-    numlink = [len(i) for i in links]
-    pagerank = [(1 / len(pages)) for i in range(len(pages))] # initialise
-    random_page_const = (1-DAMPING) / len(pages)
+    pagerank = [(1 / num_pages) for i in range(num_pages)] # initialise
+    random_page_const = (1 - damping_factor) / num_pages
 
     # Iterate till pagerank convergence
+    if trace is not None:
+        trace.start()
     while True:
-        pagerank_next = [random_page_const + (DAMPING * sum([pagerank[j] / numlink[j] for j in i])) for i in incoming_links]
-        change = max([abs(pagerank[i] - pagerank_next[i]) for i in range(len(pagerank))])
+        dangling_const = damping_factor * sum(pagerank[j] for j in dangling) / num_pages
+        shares = [
+            pagerank[j] / numlink[j] if numlink[j] else 0
+            for j in range(num_pages)
+        ]
+        pagerank_next = [
+            random_page_const + dangling_const
+            + damping_factor * sum(shares[j] for j in incoming)
+            for incoming in incoming_links
+        ]
+        change = max([abs(pagerank[i] - pagerank_next[i]) for i in range(num_pages)])
+        if trace is not None:
+            trace.record(change)
         if change < 0.001:
+            if trace is not None:
+                trace.converged = True
             break
         pagerank = pagerank_next
 
@@ -191,5 +213,63 @@ def iterate_pagerank(corpus, damping_factor):
     return pagerank_results
 
 
+def iterate_pagerank_sparse(corpus, damping_factor, tolerance=TOLERANCE,
+                            max_iterations=MAX_ITERATIONS, trace=None):
+    """
+    Return PageRank values for each page by power iteration over a sparse
+    transition matrix, stopping once the L1 change between iterations is
+    below `tolerance` or after `max_iterations`, recording progress in
+    `trace` if given.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    return graph.ranks_dict(power_iteration(
+        graph, damping_factor, tolerance, max_iterations, trace=trace
+    ))
+
+
+def iterate_pagerank_partitioned(corpus, damping_factor, workers=None,
+                                 tolerance=TOLERANCE,
+                                 max_iterations=MAX_ITERATIONS, trace=None):
+    """
+    Return PageRank values for each page like `iterate_pagerank_sparse`,
+    splitting each iteration into row blocks computed by `workers`
+    threads (one per CPU by default).
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    return graph.ranks_dict(partitioned_power_iteration(
+        graph, damping_factor, workers, tolerance, max_iterations, trace
+    ))
+
+
+def personalized_pagerank(corpus, damping_factor, personalization):
+    """
+    Return personalized PageRank values for each page, where random jumps
+    land according to `personalization` instead of uniformly.
+
+    `personalization` is either a collection of seed pages, jumped to
+    with equal probability, or a dictionary of page -> weight.
+    """
+    return personalized_pagerank_batch(corpus, damping_factor, [personalization])[0]
+
+
+def personalized_pagerank_batch(corpus, damping_factor, personalizations):
+    """
+    Return a list of personalized PageRank dictionaries, one for each of
+    `personalizations` (as for `personalized_pagerank`), all computed
+    together in a single power iteration.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    teleport = np.column_stack([
+        graph.distribution(personalization)
+        for personalization in personalizations
+    ])
+    ranks = personalized_power_iteration(graph, damping_factor, teleport)
+    return [graph.ranks_dict(ranks[:, k]) for k in range(ranks.shape[1])]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from power import MAX_ITERATIONS, TOLERANCE
+
+
+def row_blocks(matrix, blocks):
+    """
+    Split the rows of a CSR matrix into up to `blocks` contiguous ranges
+    holding roughly equal numbers of nonzeros. Returns (start, end) pairs.
+    """
+    targets = np.linspace(0, matrix.nnz, blocks + 1)
+    bounds = np.unique(np.r_[
+        0, np.searchsorted(matrix.indptr, targets), matrix.shape[0]
+    ])
+    bounds = bounds[bounds <= matrix.shape[0]]
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def partitioned_power_iteration(graph, damping_factor, workers=None,
+                                tolerance=TOLERANCE,
+                                max_iterations=MAX_ITERATIONS, trace=None):
+    """
+    Return the PageRank vector of a LinkGraph like `power_iteration`, with
+    each iteration split into row blocks of the transition matrix that
+    are multiplied on a pool of `workers` threads.
+
+    SciPy's sparse products run without holding the GIL, so blocks are
+    computed in parallel. Collecting every block's result before the next
+    iteration starts acts as the per-iteration barrier.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(graph)
+    matrix = graph.transition_matrix()
+    dangling = graph.dangling
+    blocks = [
+        (start, end, matrix[start:end])
+        for start, end in row_blocks(matrix, workers)
+    ]
+    ranks = np.full(n, 1 / n)
+    ranks_next = np.zeros(n)
+
+    def update_block(block, ranks, ranks_next, constant):
+        start, end, rows = block
+        ranks_next[start:end] = rows @ ranks
+        ranks_next[start:end] *= damping_factor
+        ranks_next[start:end] += constant
+        return np.abs(ranks_next[start:end] - ranks[start:end]).sum()
+
+    if trace is not None:
+        trace.start()
+    with ThreadPoolExecutor(workers) as pool:
+        for _ in range(max_iterations):
+            dangling_rank = ranks[dangling].sum()
+            constant = (damping_factor * dangling_rank + 1 - damping_factor) / n
+            changes = pool.map(
+                update_block, blocks,
+                [ranks] * len(blocks), [ranks_next] * len(blocks),
+                [constant] * len(blocks)
+            )
+            change = sum(changes)
+            ranks, ranks_next = ranks_next, ranks
+            if trace is not None:
+                trace.record(change)
+            if change < tolerance:
+                if trace is not None:
+                    trace.converged = True
+                break
+
+    return ranks
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+
+# Power iteration stops once the L1 change in ranks falls below this
+TOLERANCE = 1e-6
+
+# ... or after this many iterations, whichever comes first
+MAX_ITERATIONS = 1000
+
+
+class ConvergenceTrace():
+    """
+    Per-iteration record of an iterative PageRank computation: the
+    residual (change in ranks) after each iteration and the wall time
+    elapsed by then.
+    """
+
+    def __init__(self):
+        self.residuals = []
+        self.times = []
+        self.converged = False
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def record(self, residual):
+        self.residuals.append(float(residual))
+        self.times.append(time.perf_counter() - self.started)
+
+    @property
+    def iterations(self):
+        return len(self.residuals)
+
+    @property
+    def seconds(self):
+        return self.times[-1] if self.times else 0
+
+    def __str__(self):
+        state = "converged" if self.converged else "stopped"
+        residual = self.residuals[-1] if self.residuals else float("nan")
+        return (f"{state} after {self.iterations} iterations in "
+                f"{self.seconds:.4f}s, residual {residual:.3g}")
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, start=None, trace=None):
+    """
+    Return the PageRank vector of a LinkGraph by power iteration over its
+    sparse transition matrix.
+
+    Each step follows links with probability `damping_factor` and jumps
+    to a uniformly random page otherwise; rank on dangling pages is spread
+    uniformly over all pages, as if they linked to every page.
+
+    Iteration starts from uniform ranks, or from the `start` vector if
+    given, such as the ranks of a previous run on a similar graph.
+    Residuals and timings are recorded in `trace` if given.
+    """
+    n = len(graph)
+    matrix = graph.transition_matrix()
+    dangling = graph.dangling
+    if start is None:
+        ranks = np.full(n, 1 / n)
+    else:
+        ranks = np.asarray(start, dtype=np.float64) / np.sum(start)
+
+    if trace is not None:
+        trace.start()
+    for _ in range(max_iterations):
+        dangling_rank = ranks[dangling].sum()
+        ranks_next = damping_factor * (matrix @ ranks)
+        ranks_next += (damping_factor * dangling_rank + 1 - damping_factor) / n
+        change = np.abs(ranks_next - ranks).sum()
+        ranks = ranks_next
+        if trace is not None:
+            trace.record(change)
+        if change < tolerance:
+            if trace is not None:
+                trace.converged = True
+            break
+
+    return ranks
+
+
+def personalized_power_iteration(graph, damping_factor, teleport,
+                                 tolerance=TOLERANCE,
+                                 max_iterations=MAX_ITERATIONS, trace=None):
+    """
+    Return personalized PageRank vectors for a LinkGraph, one column per
+    column of the n x k `teleport` matrix, each a distribution over pages.
+
+    Random jumps, and steps from dangling pages, land according to the
+    column's teleport distribution instead of uniformly. All k vectors
+    are iterated together, so each step is a single sparse
+    matrix-matrix product. The residual recorded in `trace` is the
+    largest of the k columns' changes.
+    """
+    n = len(graph)
+    matrix = graph.transition_matrix()
+    dangling = graph.dangling
+    teleport = np.asarray(teleport, dtype=np.float64).reshape(n, -1)
+    teleport = teleport / teleport.sum(axis=0)
+    ranks = teleport.copy()
+
+    if trace is not None:
+        trace.start()
+    for _ in range(max_iterations):
+        dangling_rank = ranks[dangling].sum(axis=0)
+        ranks_next = damping_factor * (matrix @ ranks)
+        ranks_next += teleport * (damping_factor * dangling_rank + 1 - damping_factor)
+        change = np.abs(ranks_next - ranks).sum(axis=0).max()
+        ranks = ranks_next
+        if trace is not None:
+            trace.record(change)
+        if change < tolerance:
+            if trace is not None:
+                trace.converged = True
+            break
+
+    return ranks
@@ -0,0 +1,68 @@
+import numpy as np
+
+# Independent random surfers walked in lockstep
+SURFERS = 10000
+
+# Steps each surfer takes before its visits are counted, so the sample
+# does not over-weight the uniformly random starting pages; the start's
+# influence decays by the damping factor each step
+BURN_IN = 50
+
+# Visits are buffered and counted in one bincount once this many pile up
+FLUSH_SIZE = 2 ** 22
+
+
+def sample_ranks(graph, damping_factor, n, surfers=SURFERS, rng=None,
+                 burn_in=BURN_IN):
+    """
+    Return PageRank estimates for a LinkGraph from `n` samples, taken by
+    many independent random surfers stepping together.
+
+    Each step, every surfer follows a uniformly chosen link of its page
+    with probability `damping_factor` (always jumping if the page is
+    dangling) and jumps to a uniformly random page otherwise. The next
+    link is picked by indexing the CSR link array directly, so a step for
+    all surfers is a handful of vectorized array operations. Surfers take
+    `burn_in` uncounted steps first.
+    """
+    rng = rng or np.random.default_rng()
+    num_pages = len(graph)
+    surfers = max(1, min(surfers, n))
+
+    counts = np.zeros(num_pages, dtype=np.int64)
+    visits = []
+    buffered = 0
+    remaining = n
+
+    # Every surfer starts on a page chosen at random
+    current = rng.integers(num_pages, size=surfers)
+    for _ in range(burn_in):
+        current = step(current, damping_factor, graph, rng)
+
+    while remaining > 0:
+        taken = min(surfers, remaining)
+        visits.append(current[:taken])
+        buffered += taken
+        remaining -= taken
+        if buffered >= FLUSH_SIZE or remaining == 0:
+            counts += np.bincount(np.concatenate(visits), minlength=num_pages)
+            visits = []
+            buffered = 0
+        if remaining == 0:
+            break
+        current = step(current, damping_factor, graph, rng)
+
+    return counts / n
+
+
+def step(current, damping_factor, graph, rng):
+    """
+    Move every surfer on from its `current` page index by one step.
+    """
+    degree = graph.out_degree[current]
+    follow = (rng.random(len(current)) < damping_factor) & (degree > 0)
+    following = current[follow]
+    choice = (rng.random(len(following)) * degree[follow]).astype(np.int64)
+    next_page = rng.integers(len(graph), size=len(current))
+    next_page[follow] = graph.indices[graph.indptr[following] + choice]
+    return next_page
@@ -0,0 +1,68 @@
+import random
+from functools import lru_cache
+
+# Row entries (pages times cached rows) kept by each TransitionModel;
+# every dense row holds one entry per page, so the number of rows cached
+# shrinks as the corpus grows
+ROW_ENTRY_BUDGET = 2 ** 20
+
+
+class TransitionModel():
+    """
+    Compact random-surfer transition model for a corpus.
+
+    Only each page's links (as page indices) and the damping factor are
+    stored, so memory is linear in the size of the corpus. The next page
+    is chosen in constant time without building a probability row; full
+    rows are only built on request, and the most recent ones are cached
+    within a budget of `entry_budget` row entries in total.
+    """
+
+    def __init__(self, corpus, damping_factor, entry_budget=ROW_ENTRY_BUDGET):
+        self.pages = list(corpus)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        self.links = [
+            tuple(self.index[link] for link in corpus[page] if link in self.index)
+            for page in self.pages
+        ]
+        self.damping_factor = damping_factor
+        cache_size = max(1, entry_budget // max(1, len(self.pages)))
+        self.row = lru_cache(maxsize=cache_size)(self.build_row)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def next_page(self, i, rng=random):
+        """
+        Returns the index of the page visited after page index `i`.
+
+        With probability `damping_factor`, follow one of the page's links
+        at random; otherwise, or if it has none, jump to any page.
+        """
+        links = self.links[i]
+        if links and rng.random() < self.damping_factor:
+            return links[rng.randrange(len(links))]
+        return rng.randrange(len(self.pages))
+
+    def build_row(self, i):
+        """
+        Returns the dense probability distribution over next pages from
+        page index `i`, as a dictionary like `transition_model` returns.
+        """
+        n = len(self.pages)
+        links = self.links[i]
+        if not links:
+            return {page: 1 / n for page in self.pages}
+        base_probability = (1 - self.damping_factor) / n
+        row = {page: base_probability for page in self.pages}
+        redirection_prob = self.damping_factor / len(links)
+        for j in links:
+            row[self.pages[j]] += redirection_prob
+        return row
+
+    def transition_model(self, page):
+        """
+        Returns the probability distribution over which page to visit next
+        from `page`. Rows are cached, so callers must not modify them.
+        """
+        return self.row(self.index[page])